@@ -1,13 +1,27 @@
 import os
+import json
 import uuid
-import boto3
-from typing import Dict, List, Optional, Tuple
+import asyncio
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, AsyncIterator, Callable, Dict, List, Optional, Tuple
 
-from strands import Agent, tool
-from strands.models import BedrockModel
+from strands import Agent, ToolContext, tool
+from strands.handlers.callback_handler import CompositeCallbackHandler, PrintingCallbackHandler
+from strands.models import BedrockModel, CacheConfig
+from tavily import TavilyClient
 from bedrock_agentcore.memory import MemoryClient
 from bedrock_agentcore.memory.integrations.strands.config import AgentCoreMemoryConfig
-from bedrock_agentcore.memory.integrations.strands.session_manager import AgentCoreMemorySessionManager
+
+from clients import client_config, get_client, get_session
+from conversation_budget import TokenBudgetConversationManager
+from metering import DEFAULT_DB_PATH, UsageMeter
+from model_router import FAST, TurnRouter
+from result_cache import ResultCache, normalize_query
+from retrieval import RetrievalPipeline
+from speculative import KBPrefetch, KBSpeculator
+from telemetry import PhaseTimer, TracedMemorySessionManager
+from write_behind import MemoryWriter, WriteBehindSessionManager
 
 # Load environment variables
 REGION='us-east-1'
@@ -15,23 +29,196 @@ REGION='us-east-1'
 # Bedrock Model Configuration
 BEDROCK_MODEL_ID=''
 
+# Model routing (set BEDROCK_FAST_MODEL_ID to enable): short, simple turns use the fast model
+BEDROCK_FAST_MODEL_ID=os.getenv('BEDROCK_FAST_MODEL_ID', '')
+MODEL_ROUTING_MAX_FAST_WORDS=int(os.getenv('MODEL_ROUTING_MAX_FAST_WORDS', '12'))
+
 # Bedrock Guardrails
 GUARDRAIL_ID=''
 GUARDRAIL_VERSION='1'
+GUARDRAIL_TRACE='enabled'
+
+# Bedrock prompt caching for the static system prompt and tool specs
+PROMPT_CACHE_ENABLED=os.getenv('PROMPT_CACHE_ENABLED', 'true').lower() == 'true'
 
 # Knowledge Base
 KNOWLEDGE_BASE_ID=''
+KB_NUMBER_OF_RESULTS=int(os.getenv('KB_NUMBER_OF_RESULTS', '8'))
+
+# Knowledge Base retrieval pipeline: passages kept, score floor, near-duplicate
+# similarity, local rerank and the token budget of the tool result
+KB_TOP_K=int(os.getenv('KB_TOP_K', '3'))
+KB_MIN_SCORE=float(os.getenv('KB_MIN_SCORE', '0.0'))
+KB_DEDUP_THRESHOLD=float(os.getenv('KB_DEDUP_THRESHOLD', '0.8'))
+KB_RERANK=os.getenv('KB_RERANK', 'false').lower() == 'true'
+KB_MAX_TOKENS=int(os.getenv('KB_MAX_TOKENS', '1200'))
+
+# Knowledge Base result cache (set KB_CACHE_PATH to persist across restarts)
+KB_CACHE_TTL=float(os.getenv('KB_CACHE_TTL', '3600'))
+KB_CACHE_MAX_ENTRIES=int(os.getenv('KB_CACHE_MAX_ENTRIES', '512'))
+KB_CACHE_PATH=os.getenv('KB_CACHE_PATH')
+
+# Local vector index tier (empty path disables it): queries whose best local match
+# reaches KB_LOCAL_MIN_SIMILARITY (cosine) are answered without the remote retrieve
+KB_LOCAL_INDEX_PATH=os.getenv('KB_LOCAL_INDEX_PATH', '')
+KB_LOCAL_MIN_SIMILARITY=float(os.getenv('KB_LOCAL_MIN_SIMILARITY', '0.75'))
+KB_EMBEDDING_MODEL_ID=os.getenv('KB_EMBEDDING_MODEL_ID', 'amazon.titan-embed-text-v2:0')
+
+# Speculative knowledge base prefetch (opt-in): retrieval for likely knowledge base questions
+# starts with the first model call and serves a knowledge_base_search whose query matches
+KB_SPECULATIVE_PREFETCH=os.getenv('KB_SPECULATIVE_PREFETCH', 'false').lower() == 'true'
+KB_SPECULATIVE_MATCH=float(os.getenv('KB_SPECULATIVE_MATCH', '0.6'))
 
 # Tavily Search API
 TAVILY_API_KEY='t'
+WEB_SEARCH_MAX_RESULTS=3
+
+# Hybrid search: per-backend deadlines (seconds) and result budget (characters)
+HYBRID_KB_TIMEOUT=float(os.getenv('HYBRID_KB_TIMEOUT', '5'))
+HYBRID_WEB_TIMEOUT=float(os.getenv('HYBRID_WEB_TIMEOUT', '8'))
+HYBRID_MAX_CHARS=int(os.getenv('HYBRID_MAX_CHARS', '6000'))
+
+# Web search result cache (kept short, results go stale quickly)
+WEB_CACHE_TTL=float(os.getenv('WEB_CACHE_TTL', '300'))
+WEB_CACHE_MAX_ENTRIES=int(os.getenv('WEB_CACHE_MAX_ENTRIES', '256'))
+
+# Semantic response cache (opt-in): a question whose embedding similarity to an earlier
+# one reaches RESPONSE_CACHE_THRESHOLD gets the earlier answer without a model turn
+RESPONSE_CACHE_ENABLED=os.getenv('RESPONSE_CACHE_ENABLED', 'false').lower() == 'true'
+RESPONSE_CACHE_THRESHOLD=float(os.getenv('RESPONSE_CACHE_THRESHOLD', '0.92'))
+RESPONSE_CACHE_TTL=float(os.getenv('RESPONSE_CACHE_TTL', '3600'))
+RESPONSE_CACHE_MAX_ENTRIES=int(os.getenv('RESPONSE_CACHE_MAX_ENTRIES', '256'))
 
 # Memory Configuration
 MEMORY_ID=''
 MEMORY_ARN=''
 
+# Write-behind memory persistence: events are written after the response in batches
+MEMORY_WRITE_BEHIND=os.getenv('MEMORY_WRITE_BEHIND', 'true').lower() == 'true'
+MEMORY_BATCH_SIZE=int(os.getenv('MEMORY_BATCH_SIZE', '32'))
+MEMORY_WRITER_THREADS=int(os.getenv('MEMORY_WRITER_THREADS', '4'))
+MEMORY_FLUSH_RETRIES=int(os.getenv('MEMORY_FLUSH_RETRIES', '3'))
 
-@tool
-def knowledge_base_search(query: str) -> str:
+# Conversation window: token budget for history sent to the model per call
+CONVERSATION_TOKEN_BUDGET=int(os.getenv('CONVERSATION_TOKEN_BUDGET', '8000'))
+CONVERSATION_PRESERVE_RECENT=int(os.getenv('CONVERSATION_PRESERVE_RECENT', '10'))
+
+# Usage metering sink (SQLite, empty keeps totals in memory only) and flush interval in seconds
+METERING_DB_PATH=os.getenv('METERING_DB_PATH', DEFAULT_DB_PATH)
+METERING_FLUSH_INTERVAL=float(os.getenv('METERING_FLUSH_INTERVAL', '30'))
+
+# Threads available for blocking SDK calls (boto3, Tavily) made from async code
+BLOCKING_POOL_SIZE=int(os.getenv('BLOCKING_POOL_SIZE', '32'))
+
+_blocking_pool = ThreadPoolExecutor(max_workers=BLOCKING_POOL_SIZE, thread_name_prefix='blocking')
+
+
+async def run_blocking(func: Callable, *args: Any) -> Any:
+    """Run a blocking call on the bounded pool without stalling the event loop"""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(_blocking_pool, func, *args)
+
+
+memory_writer = MemoryWriter(max_workers=MEMORY_WRITER_THREADS, retries=MEMORY_FLUSH_RETRIES)
+
+usage_meter = UsageMeter(METERING_DB_PATH, flush_interval=METERING_FLUSH_INTERVAL)
+
+turn_router = TurnRouter(max_fast_words=MODEL_ROUTING_MAX_FAST_WORDS) if BEDROCK_FAST_MODEL_ID else None
+
+kb_pipeline = RetrievalPipeline(
+    top_k=KB_TOP_K,
+    min_score=KB_MIN_SCORE,
+    dedup_threshold=KB_DEDUP_THRESHOLD,
+    rerank=KB_RERANK,
+    max_tokens=KB_MAX_TOKENS
+)
+
+kb_cache = ResultCache(
+    'knowledge_base',
+    max_entries=KB_CACHE_MAX_ENTRIES,
+    ttl=KB_CACHE_TTL,
+    persist_path=KB_CACHE_PATH
+)
+
+
+def _open_local_index():
+    """Open the local vector index if configured (NumPy is only needed when it is)"""
+    if not KB_LOCAL_INDEX_PATH:
+        return None
+    from vector_index import VectorIndex, titan_embedder
+    return VectorIndex(
+        KB_LOCAL_INDEX_PATH,
+        titan_embedder(KB_EMBEDDING_MODEL_ID, REGION),
+        min_similarity=KB_LOCAL_MIN_SIMILARITY
+    )
+
+
+kb_local_index = _open_local_index()
+
+
+def _open_response_cache():
+    """Create the semantic response cache if enabled"""
+    if not RESPONSE_CACHE_ENABLED:
+        return None
+    from response_cache import SemanticResponseCache
+    from vector_index import titan_embedder
+    return SemanticResponseCache(
+        titan_embedder(KB_EMBEDDING_MODEL_ID, REGION),
+        threshold=RESPONSE_CACHE_THRESHOLD,
+        ttl=RESPONSE_CACHE_TTL,
+        max_entries=RESPONSE_CACHE_MAX_ENTRIES
+    )
+
+
+response_cache = _open_response_cache()
+
+
+def retrieve_knowledge_base(query: str, number_of_results: int = KB_NUMBER_OF_RESULTS) -> List[Dict]:
+    """Retrieve raw results from the knowledge base, served from cache when fresh"""
+    def retrieve() -> List[Dict]:
+        if kb_local_index is not None:
+            try:
+                local_results = kb_local_index.search(query, number_of_results)
+                if local_results is not None:
+                    return local_results
+            except Exception as e:
+                print(f"Local index lookup failed, using the knowledge base: {str(e)}")
+        client = get_client('bedrock-agent-runtime', REGION)
+        response = client.retrieve(
+            knowledgeBaseId=KNOWLEDGE_BASE_ID,
+            retrievalQuery={'text': query},
+            retrievalConfiguration={'vectorSearchConfiguration': {'numberOfResults': number_of_results}}
+        )
+        results = response.get('retrievalResults', [])
+        if kb_local_index is not None:
+            kb_local_index.add_results(results)
+        return results
+    
+    cache_key = (KNOWLEDGE_BASE_ID, number_of_results, normalize_query(query))
+    return kb_cache.get_or_load(cache_key, retrieve)
+
+
+kb_speculator = KBSpeculator(
+    retrieve_knowledge_base,
+    _blocking_pool,
+    match_threshold=KB_SPECULATIVE_MATCH
+) if KB_SPECULATIVE_PREFETCH and KNOWLEDGE_BASE_ID else None
+
+
+async def _kb_results(query: str, prefetch: Optional[KBPrefetch]) -> List[Dict]:
+    """Knowledge base results for a tool query, from the turn's speculative prefetch when it matches"""
+    if kb_speculator is not None:
+        future = kb_speculator.take(prefetch, query)
+        if future is not None:
+            try:
+                return await asyncio.wrap_future(future)
+            except Exception as e:
+                print(f"Speculative knowledge base prefetch failed, retrieving again: {str(e)}")
+    return await run_blocking(retrieve_knowledge_base, query)
+
+
+@tool(context=True)
+async def knowledge_base_search(query: str, tool_context: Optional[ToolContext] = None) -> str:
     """Search the knowledge base for relevant information."""
     try:
         print("Calling Knowledgebase to retrieve information")
@@ -39,39 +226,57 @@ def knowledge_base_search(query: str) -> str:
         if not kb_id:
             return "Error: KNOWLEDGE_BASE_ID environment variable not set"
         
-        region = REGION
-        client = boto3.client('bedrock-agent-runtime', region_name=region)
-        response = client.retrieve(
-            knowledgeBaseId=kb_id,
-            retrievalQuery={'text': query},
-            retrievalConfiguration={'vectorSearchConfiguration': {'numberOfResults': 3}}
-        )
-        
-        results = []
-        for result in response.get('retrievalResults', []):
-            content = result.get('content', {}).get('text', '')
-            results.append(content)
+        prefetch = tool_context.invocation_state.get('kb_prefetch') if tool_context else None
+        passages = kb_pipeline.select(query, await _kb_results(query, prefetch))
         
-        return f"Knowledge Base Results: {' '.join(results)}" if results else "No results found"
+        return f"Knowledge Base Results:\n{kb_pipeline.format(passages)}" if passages else "No results found"
     except Exception as e:
         return f"Knowledge base search error: {str(e)}"
 
+web_cache = ResultCache(
+    'web_search',
+    max_entries=WEB_CACHE_MAX_ENTRIES,
+    ttl=WEB_CACHE_TTL
+)
+
+_tavily_client = None
+_tavily_client_lock = threading.Lock()
+
+
+def get_tavily_client() -> TavilyClient:
+    """Get the shared Tavily client, creating it on first use"""
+    global _tavily_client
+    client = _tavily_client
+    if client is None:
+        with _tavily_client_lock:
+            if _tavily_client is None:
+                _tavily_client = TavilyClient(api_key=TAVILY_API_KEY)
+            client = _tavily_client
+    return client
+
+
+def search_web(query: str, max_results: int = WEB_SEARCH_MAX_RESULTS) -> List[Dict]:
+    """Search the web with Tavily, sharing one upstream call across identical concurrent queries"""
+    def search() -> List[Dict]:
+        response = get_tavily_client().search(query=query, max_results=max_results)
+        return response.get('results', [])
+    
+    cache_key = (max_results, normalize_query(query))
+    return web_cache.get_or_load(cache_key, search)
+
+
 @tool 
-def web_search(query: str) -> str:
+async def web_search(query: str) -> str:
     """Search the web for current information using Tavily."""
     try:
-        from tavily import TavilyClient
         print("Calling WEB SEARCH to retrieve information")
 
         tavily_api_key = TAVILY_API_KEY
         if not tavily_api_key:
             return "Error: TAVILY_API_KEY environment variable not set"
         
-        client = TavilyClient(api_key=tavily_api_key)
-        response = client.search(query=query, max_results=3)
-        
         results = []
-        for result in response.get('results', []):
+        for result in await run_blocking(search_web, query):
             title = result.get('title', 'No title')
             content = result.get('content', 'No content')
             url = result.get('url', 'No URL')
@@ -81,6 +286,128 @@ def web_search(query: str) -> str:
     except Exception as e:
         return f"Web search error: {str(e)}"
 
+def _hybrid_passages(kb_passages: List[Dict], web_results: List[Dict]) -> List[str]:
+    """Merge knowledge base passages and web results, dropping duplicate passages"""
+    passages = []
+    seen = set()
+    
+    candidates = [
+        ('KB', passage['text'], passage['source'])
+        for passage in kb_passages
+    ] + [
+        ('Web', f"{result.get('title', 'No title')}: {result.get('content', '')}", result.get('url', ''))
+        for result in web_results
+    ]
+    
+    for label, text, source in candidates:
+        fingerprint = normalize_query(text)
+        if not fingerprint or fingerprint in seen:
+            continue
+        seen.add(fingerprint)
+        passages.append(f"[{label}] {text} ({source})" if source else f"[{label}] {text}")
+    
+    return passages
+
+
+async def _with_deadline(name: str, func: Callable, query: str, timeout: float, enabled: bool = True) -> Tuple[List[Dict], Optional[str]]:
+    """Run one retrieval backend, returning its results or a note on failure"""
+    if not enabled:
+        return [], None
+    try:
+        return await asyncio.wait_for(run_blocking(func, query), timeout), None
+    except asyncio.TimeoutError:
+        return [], f"{name} search timed out"
+    except Exception as e:
+        return [], f"{name} search error: {str(e)}"
+
+
+@tool
+async def hybrid_search(query: str) -> str:
+    """Search the knowledge base and the web at the same time and return the combined results.
+    Use this when a question may need both Agentic AI Memory material and current web information."""
+    print("Calling HYBRID SEARCH to retrieve information")
+    if not KNOWLEDGE_BASE_ID and not TAVILY_API_KEY:
+        return "Error: neither KNOWLEDGE_BASE_ID nor TAVILY_API_KEY is set"
+    
+    # Each backend has its own deadline, so a slow one never delays a fast one
+    (kb_results, kb_note), (web_results, web_note) = await asyncio.gather(
+        _with_deadline('Knowledge base', retrieve_knowledge_base, query, HYBRID_KB_TIMEOUT, enabled=bool(KNOWLEDGE_BASE_ID)),
+        _with_deadline('Web', search_web, query, HYBRID_WEB_TIMEOUT, enabled=bool(TAVILY_API_KEY))
+    )
+    notes = [note for note in (kb_note, web_note) if note]
+    
+    passages = _hybrid_passages(kb_pipeline.select(query, kb_results), web_results)
+    
+    # Keep whole passages until the budget is spent
+    output = []
+    used = 0
+    for passage in passages:
+        if used + len(passage) > HYBRID_MAX_CHARS:
+            if not output:
+                output.append(passage[:HYBRID_MAX_CHARS])
+            break
+        output.append(passage)
+        used += len(passage)
+    
+    response = f"Hybrid search results: {' | '.join(output)}" if output else "No results found"
+    if notes:
+        response += f" (Note: {'; '.join(notes)})"
+    return response
+
+# Session-independent setup shared by every CopilotAgent in the process
+TOOLS = [knowledge_base_search, web_search, hybrid_search]
+
+# Identical for every actor and turn, so it can sit in front of the cache point
+SYSTEM_PROMPT = """You are a helpful AI assistant with persistent memory capabilities.
+                
+                You have access to:
+                - Knowledge base search: Use this for questions regarding Agentic AI Memory
+                - Web search: Use this for general questions
+                - Hybrid search: Use this when a question needs both Agentic AI Memory material and current web information
+                
+                Use your memory to provide personalized, context-aware responses based on this user's history."""
+
+ACTOR_PROMPT = "You are assisting actor: {actor_id}."
+
+
+def build_system_prompt(actor_id: str) -> List[Dict]:
+    """Build the system prompt with the actor-specific part after the cache point"""
+    blocks = [{"text": SYSTEM_PROMPT}]
+    if PROMPT_CACHE_ENABLED:
+        blocks.append({"cachePoint": {"type": "default"}})
+    blocks.append({"text": ACTOR_PROMPT.format(actor_id=actor_id)})
+    return blocks
+
+
+_shared_models: Dict[str, BedrockModel] = {}
+_shared_model_lock = threading.Lock()
+
+
+def get_shared_model(model_id: Optional[str] = None) -> BedrockModel:
+    """Get the process-wide Bedrock model for a model ID (default: the strong model), creating it on first use"""
+    model_id = model_id or BEDROCK_MODEL_ID
+    model = _shared_models.get(model_id)
+    if model is None:
+        with _shared_model_lock:
+            model = _shared_models.get(model_id)
+            if model is None:
+                model = BedrockModel(
+                    model_id=model_id,
+                    guardrail_id=GUARDRAIL_ID,
+                    guardrail_version=GUARDRAIL_VERSION,
+                    guardrail_trace=GUARDRAIL_TRACE,
+                    region_name=REGION,
+                    boto_client_config=client_config('bedrock-runtime'),
+                    cache_config=CacheConfig(strategy="auto", tools_ttl=True) if PROMPT_CACHE_ENABLED else None
+                )
+                _shared_models[model_id] = model
+    return model
+
+
+class WriteBehindTracedSessionManager(TracedMemorySessionManager, WriteBehindSessionManager):
+    """Traced session manager whose memory writes happen after the response"""
+
+
 class CopilotAgent:
     """Main agent class for Copilot functionality"""
     
@@ -90,45 +417,59 @@ class CopilotAgent:
         self.memory_id = MEMORY_ID
         self.region = REGION
         self.agent = None
+        self.session_manager = None
+        self.last_usage: Dict[str, int] = {}
+        self.last_cache_hit = False
+        self._turn_route: Optional[str] = None
+        self._turn_context_free = False
+        self._tool_call_counts: Dict[str, int] = {}
+        self.timer = PhaseTimer({'copilot.actor_id': self.actor_id, 'copilot.session_id': self.session_id})
         self._initialize_agent()
     
     def _initialize_agent(self):
         """Initialize the agent with memory and tools"""
         try:
             # Configure memory
+            # async_mode offloads the per-turn memory hooks (customer context retrieval,
+            # append_message, sync_agent, flushes) to threads instead of the event loop
             agentcore_memory_config = AgentCoreMemoryConfig(
                 memory_id=self.memory_id,
                 session_id=self.session_id,
-                actor_id=self.actor_id
+                actor_id=self.actor_id,
+                async_mode=True
             )
             
-            ac_session_manager = AgentCoreMemorySessionManager(
+            # Reports memory restore and write-back to the phase timer
+            session_manager_kwargs = dict(
+                phase_timer=self.timer,
                 agentcore_memory_config=agentcore_memory_config,
-                region_name=self.region
-            )
-            
-            # Configure Bedrock model
-            bedrock_model = BedrockModel(
-                model_id=BEDROCK_MODEL_ID,
-                guardrail_id=GUARDRAIL_ID,
-                guardrail_version=GUARDRAIL_VERSION,
-                guardrail_trace=GUARDRAIL_TRACE,
-                region_name=REGION
+                region_name=self.region,
+                boto_session=get_session(self.region),
+                boto_client_config=client_config('bedrock-agentcore')
             )
+            if MEMORY_WRITE_BEHIND:
+                ac_session_manager = WriteBehindTracedSessionManager(
+                    writer=memory_writer,
+                    batch_size=MEMORY_BATCH_SIZE,
+                    **session_manager_kwargs
+                )
+            else:
+                ac_session_manager = TracedMemorySessionManager(**session_manager_kwargs)
             
-            # Create agent
+            # Create agent (model and tools are shared across sessions)
             self.agent = Agent(
-                system_prompt=f"""You are a helpful AI assistant with persistent memory capabilities for actor: {self.actor_id}.
-                
-                You have access to:
-                - Knowledge base search: Use this for questions regarding Agentic AI Memory
-                - Web search: Use this for general questions
-                
-                Use your memory to provide personalized, context-aware responses based on this user's history.""",
-                model=bedrock_model,
-                tools=[knowledge_base_search, web_search],
-                session_manager=ac_session_manager
+                system_prompt=build_system_prompt(self.actor_id),
+                model=get_shared_model(),
+                tools=TOOLS,
+                session_manager=ac_session_manager,
+                conversation_manager=TokenBudgetConversationManager(
+                    max_tokens=CONVERSATION_TOKEN_BUDGET,
+                    preserve_recent_messages=CONVERSATION_PRESERVE_RECENT
+                ),
+                hooks=[self.timer],
+                callback_handler=CompositeCallbackHandler(PrintingCallbackHandler(), self.timer.on_stream_event)
             )
+            self.session_manager = ac_session_manager
             
         except Exception as e:
             raise Exception(f"Failed to initialize agent: {str(e)}")
@@ -139,22 +480,217 @@ class CopilotAgent:
             return "Error: Agent not initialized"
         
         try:
-            result = self.agent(message)
-            
-            # Extract response text
-            response_text = ""
-            if hasattr(result, 'message') and isinstance(result.message, dict):
-                content = result.message.get('content', [])
-                if content and isinstance(content, list) and len(content) > 0:
-                    response_text = content[0].get('text', str(result))
-            else:
-                response_text = str(result)
-            
+            self._wait_for_memory_flush()
+            with self.timer.turn():
+                cached = self._cached_answer(message)
+                if cached is None:
+                    self._route_turn(message)
+                    prefetch = kb_speculator.start(message) if kb_speculator else None
+                    try:
+                        # Async memory hooks need the async invocation path; chat runs on a worker thread
+                        result = asyncio.run(self.agent.invoke_async(message, invocation_state={'kb_prefetch': prefetch}))
+                    finally:
+                        self._finish_kb_prefetch(prefetch)
+            if cached is not None:
+                self._record_cached_turn(message)
+                return cached
+            record = self._record_usage(message, result)
+            response_text = self._extract_response_text(result)
+            self._cache_answer(message, response_text, result, record['tools'])
             return response_text
             
         except Exception as e:
             return f"Error processing message: {str(e)}"
     
+    async def stream_chat(self, message: str) -> AsyncIterator[str]:
+        """Send a message to the agent and yield response text as it is generated"""
+        if not self.agent:
+            yield "Error: Agent not initialized"
+            return
+        
+        try:
+            streamed = False
+            result = None
+            await run_blocking(self._wait_for_memory_flush)
+            with self.timer.turn():
+                cached = await run_blocking(self._cached_answer, message)
+                if cached is None:
+                    self._route_turn(message)
+                    prefetch = kb_speculator.start(message) if kb_speculator else None
+                    try:
+                        async for event in self.agent.stream_async(message, invocation_state={'kb_prefetch': prefetch}):
+                            if "data" in event and event["data"]:
+                                streamed = True
+                                yield event["data"]
+                            elif "result" in event:
+                                result = event["result"]
+                                if not streamed:
+                                    # Nothing was streamed (e.g. guardrail intervention), send the final text
+                                    yield self._extract_response_text(result)
+                    finally:
+                        self._finish_kb_prefetch(prefetch)
+            if cached is not None:
+                self._record_cached_turn(message)
+                yield cached
+            elif result is not None:
+                record = self._record_usage(message, result)
+                # Storing embeds the question when its vector is no longer memoized
+                await run_blocking(self._cache_answer, message, self._extract_response_text(result), result, record['tools'])
+            
+        except Exception as e:
+            yield f"Error processing message: {str(e)}"
+    
+    def _wait_for_memory_flush(self):
+        """Let the previous turn's write-behind flush finish so this turn's events queue behind it"""
+        if isinstance(self.session_manager, WriteBehindSessionManager):
+            self.session_manager.wait_for_flush()
+    
+    def _route_turn(self, message: str):
+        """Point the agent at the fast or the strong model for this turn"""
+        self._turn_route = None
+        if turn_router is None:
+            return
+        route, reason = turn_router.route(message)
+        self.agent.model = get_shared_model(BEDROCK_FAST_MODEL_ID if route == FAST else BEDROCK_MODEL_ID)
+        self._turn_route = route
+        self.timer.annotate('route', route)
+        self.timer.annotate('route_reason', reason)
+        print(f"Routing turn for {self.actor_id}:{self.session_id} to the {route} model ({reason})")
+    
+    def _finish_kb_prefetch(self, prefetch: Optional[KBPrefetch]):
+        """Record whether the turn's speculative retrieval was used"""
+        if prefetch is None:
+            return
+        outcome = kb_speculator.finish(prefetch)
+        self.timer.annotate('kb_prefetch', outcome)
+        stats = kb_speculator.stats()
+        print(f"Speculative knowledge base prefetch: {outcome} (hit rate {stats['hit_rate']:.0%}, waste rate {stats['waste_rate']:.0%})")
+    
+    def _cached_answer(self, message: str) -> Optional[str]:
+        """Answer from the semantic response cache, writing the exchange to session memory"""
+        self.last_cache_hit = False
+        # Cached answers are keyed on the question alone, so only a session's opening
+        # question (no history it could refer to) may be served or stored
+        self._turn_context_free = not self.agent.messages
+        if response_cache is None or not self._turn_context_free:
+            return None
+        try:
+            with self.timer.phase('response_cache'):
+                answer = response_cache.lookup(self.actor_id, message)
+            if answer is None:
+                return None
+            # Keep the conversation and memory consistent with a real turn
+            for turn_message in (
+                {'role': 'user', 'content': [{'text': message}]},
+                {'role': 'assistant', 'content': [{'text': answer}]}
+            ):
+                self.agent.messages.append(turn_message)
+                self.session_manager.append_message(turn_message, self.agent)
+            self.session_manager.sync_agent(self.agent)
+            if isinstance(self.session_manager, WriteBehindSessionManager):
+                self.session_manager.schedule_flush()
+        except Exception as e:
+            print(f"Response cache lookup failed, running the turn: {str(e)}")
+            return None
+        self.last_cache_hit = True
+        return answer
+    
+    def _cache_answer(self, message: str, answer: str, result, tools: Dict[str, int]):
+        """Cache the answer to a session's opening question; impersonal knowledge-base-only answers are shared by all actors"""
+        # Web results go stale and guardrail or tool-use stops are not answers
+        if response_cache is None or not self._turn_context_free or result.stop_reason != 'end_turn' or set(tools) - {'knowledge_base_search'}:
+            return
+        shared = 'knowledge_base_search' in tools and not self._turn_personalized() and self.actor_id.lower() not in answer.lower()
+        try:
+            response_cache.put(self.actor_id, message, answer, shared=shared)
+        except Exception as e:
+            print(f"Error caching response: {str(e)}")
+    
+    def _turn_personalized(self) -> bool:
+        """Whether long-term memory about the actor was injected into this turn's question"""
+        context_tag = f"<{self.session_manager.config.context_tag}>"
+        first_message = self.agent.messages[0] if self.agent.messages else {}
+        return any(context_tag in block.get('text', '') for block in first_message.get('content', []))
+    
+    def _record_cached_turn(self, message: str):
+        """Meter a turn answered from the response cache (no model tokens)"""
+        self.last_usage = {'inputTokens': 0, 'outputTokens': 0, 'cacheReadInputTokens': 0, 'cacheWriteInputTokens': 0}
+        usage_meter.record(self.actor_id, self.session_id, message, self.last_usage, latency_ms=self.last_timings.get('total_ms', 0))
+        print(f"Turn for {self.actor_id}:{self.session_id} answered from the response cache")
+    
+    def _record_usage(self, message: str, result) -> Dict:
+        """Keep the token usage of the last turn (including prompt cache reads and writes) and meter it"""
+        metrics = result.metrics
+        # Strands accumulates usage over the agent's lifetime, the latest invocation is this turn
+        invocation = metrics.latest_agent_invocation
+        usage = invocation.usage if invocation else metrics.accumulated_usage
+        self.last_usage = {
+            'inputTokens': usage.get('inputTokens', 0),
+            'outputTokens': usage.get('outputTokens', 0),
+            'cacheReadInputTokens': usage.get('cacheReadInputTokens', 0),
+            'cacheWriteInputTokens': usage.get('cacheWriteInputTokens', 0)
+        }
+        
+        # Tool metrics are cumulative too, diff against the previous turn
+        tool_call_counts = {name: tool.call_count for name, tool in metrics.tool_metrics.items()}
+        tools = {
+            name: count - self._tool_call_counts.get(name, 0)
+            for name, count in tool_call_counts.items()
+            if count > self._tool_call_counts.get(name, 0)
+        }
+        self._tool_call_counts = tool_call_counts
+        
+        record = usage_meter.record(
+            self.actor_id,
+            self.session_id,
+            message,
+            self.last_usage,
+            cycles=len(invocation.cycles) if invocation else metrics.cycle_count,
+            tools=tools,
+            latency_ms=self.last_timings.get('total_ms', 0),
+            model_id=self.agent.model.get_config().get('model_id')
+        )
+        print(
+            f"Turn usage for {self.actor_id}:{self.session_id}: "
+            f"input={record['input_tokens']} output={record['output_tokens']} "
+            f"cache_read={record['cache_read_tokens']} cache_write={record['cache_write_tokens']} "
+            f"cycles={record['cycles']} tool_calls={record['tool_calls']} cost=${record['cost']:.5f}"
+        )
+        if self._turn_route:
+            turn_router.record(self._turn_route, record['latency_ms'])
+            print(f"Turn latency on the {self._turn_route} model: {record['latency_ms']}ms")
+        return record
+    
+    @property
+    def last_timings(self) -> Dict:
+        """Per-phase timing breakdown (ms) of the last turn"""
+        return self.timer.last_timings
+    
+    @staticmethod
+    def _extract_response_text(result) -> str:
+        """Extract response text from an agent result"""
+        response_text = ""
+        if hasattr(result, 'message') and isinstance(result.message, dict):
+            content = result.message.get('content', [])
+            if content and isinstance(content, list) and len(content) > 0:
+                response_text = content[0].get('text', str(result))
+        else:
+            response_text = str(result)
+        
+        return response_text
+    
+    def estimate_size(self) -> int:
+        """Estimate the in-memory footprint of the conversation in bytes"""
+        if not self.agent:
+            return 0
+        return len(json.dumps(self.agent.messages, default=str))
+    
+    def close(self):
+        """Flush pending memory events before the agent is discarded"""
+        if self.session_manager and hasattr(self.session_manager, 'close'):
+            self.session_manager.close()
+        self.agent = None
+    
     def get_session_info(self) -> Dict:
         """Get current session information"""
         return {
@@ -2,52 +2,183 @@
 Copilot Agent for AgentCore Runtime
 Following the official Strands + Bedrock model pattern from AWS samples
 """
+import os
+import time
+import asyncio
 from bedrock_agentcore.runtime import BedrockAgentCoreApp
-from agent import CopilotAgent
+from session_cache import AgentCache
+from session_dispatch import SessionDispatcher, SessionBusyError
+import warmup
+
+# agent.py (strands, memory integration, boto3, tavily) is imported by the
+# warm-up thread so the server can start answering /ping without waiting for it
+
+# Agent cache limits (override via environment)
+AGENT_CACHE_MAX_ENTRIES = int(os.getenv("AGENT_CACHE_MAX_ENTRIES", "256"))
+AGENT_CACHE_MAX_BYTES = int(os.getenv("AGENT_CACHE_MAX_BYTES", str(256 * 1024 * 1024)))
+AGENT_CACHE_IDLE_TTL = float(os.getenv("AGENT_CACHE_IDLE_TTL", "1800"))
+
+# Per-session request queue limits (override via environment)
+SESSION_MAX_QUEUED = int(os.getenv("SESSION_MAX_QUEUED", "4"))
+SESSION_QUEUE_TIMEOUT = float(os.getenv("SESSION_QUEUE_TIMEOUT", "120"))
 
 # Initialize the AgentCore app
 app = BedrockAgentCoreApp()
 
-# Global agent cache for session management
-agent_cache = {}
+
+def _evict_agent(cache_key: str, agent):
+    """Flush the session manager of an agent leaving the cache"""
+    stats = agent_cache.stats()
+    print(
+        f"Evicting cached agent for {cache_key} "
+        f"(entries={stats['entries']}, hits={stats['hits']}, misses={stats['misses']}, "
+        f"hit_rate={stats['hit_rate']:.2f}, evictions={stats['evictions']}, expirations={stats['expirations']})"
+    )
+    agent.close()
+
+
+# Serializes requests within a session; sessions run in parallel
+dispatcher = SessionDispatcher(
+    max_queued=SESSION_MAX_QUEUED,
+    queue_timeout=SESSION_QUEUE_TIMEOUT
+)
+
+# Global agent cache for session management; agents of sessions with a request
+# in flight are never evicted, so a turn never loses its agent or session manager
+agent_cache = AgentCache(
+    max_entries=AGENT_CACHE_MAX_ENTRIES,
+    max_bytes=AGENT_CACHE_MAX_BYTES,
+    idle_ttl=AGENT_CACHE_IDLE_TTL,
+    sizeof=lambda agent: agent.estimate_size(),
+    on_evict=_evict_agent,
+    in_use=dispatcher.is_active
+)
+
+@app.ping
+def ping():
+    """Kick off warm-up on the first health check; status stays automatic"""
+    warmup.start()
+    return None
 
 @app.entrypoint
-def copilot_agent(payload):
+async def copilot_agent(payload):
     """
     Main entrypoint for AgentCore Runtime
-    Receives payload and returns agent response
+    Receives payload and streams the agent response as it is generated.
+    Set "stream": false in the payload to receive the full response as a single event.
+    Streamed responses end with a {"metadata": {...}} event carrying per-turn token usage.
+    Set "timings": true to also get a per-phase latency breakdown (ms) in that event;
+    non-streamed responses then end with the same metadata event.
+    Set "prefetch": true (no prompt needed) to build and restore the session's agent
+    ahead of the first message; the response is a single metadata event.
+    Set "invalidate_cache" to "actor", "shared" or "all" to drop semantic response
+    cache entries (alone, or before answering the prompt). Metadata events carry
+    "cached": true when the answer came from that cache.
+    Set "usage" to a query ({"actor_id", "since", "order_by", "limit"}, all optional)
+    to get this runtime's metered usage as a single {"usage": {...}} event.
+    Set "stats": true to get this runtime's cache and dispatcher counters as a
+    single {"stats": {...}} event.
     """
     try:
         # Extract parameters from payload
         user_input = payload.get("prompt", payload.get("message", ""))
         actor_id = payload.get("actor_id", "default_user")
         session_id = payload.get("session_id")
-        
-        if not user_input:
-            return "Error: No input message provided"
-        
+        stream = payload.get("stream", True)
+        include_timings = payload.get("timings", False)
+        prefetch = payload.get("prefetch", False)
+        invalidate_cache = payload.get("invalidate_cache")
+        usage_query = payload.get("usage")
+        include_stats = payload.get("stats", False)
+
+        if usage_query is not None:
+            agent_module = await asyncio.to_thread(warmup.wait)
+            usage = await agent_module.run_blocking(agent_module.usage_meter.query, usage_query or {})
+            yield {"usage": usage}
+            return
+
+        if include_stats:
+            agent_module = await asyncio.to_thread(warmup.wait)
+            yield {"stats": {
+                "agent_cache": agent_cache.stats(),
+                "dispatcher": dispatcher.stats(),
+                "kb_cache": agent_module.kb_cache.stats(),
+                "web_cache": agent_module.web_cache.stats()
+            }}
+            return
+
+        if invalidate_cache:
+            agent_module = await asyncio.to_thread(warmup.wait)
+            if agent_module.response_cache is not None:
+                if invalidate_cache == "all":
+                    agent_module.response_cache.invalidate()
+                else:
+                    agent_module.response_cache.invalidate(
+                        actor_id=actor_id if invalidate_cache == "actor" else None,
+                        shared=invalidate_cache == "shared"
+                    )
+            if not user_input:
+                yield {"metadata": {"invalidated": invalidate_cache}}
+                return
+
+        if not user_input and not prefetch:
+            yield "Error: No input message provided"
+            return
+
         if not session_id:
-            return "Error: session_id is required"
-        
+            yield "Error: session_id is required"
+            return
+
         # Create cache key for this session
         cache_key = f"{actor_id}:{session_id}"
-        
-        # Get or create agent for this session
-        if cache_key not in agent_cache:
-            agent_cache[cache_key] = CopilotAgent(
-                actor_id=actor_id,
-                session_id=session_id
+
+        # Wait for the deferred agent import and shared model (instant once warm)
+        agent_module = await asyncio.to_thread(warmup.wait)
+
+        # One request at a time per session: Strands agents are not reentrant
+        queued_at = time.perf_counter()
+        async with dispatcher.session(cache_key):
+            # Get or create agent for this session (construction restores memory, keep it off the event loop)
+            acquired_at = time.perf_counter()
+            agent = await agent_module.run_blocking(
+                agent_cache.get_or_create,
+                cache_key,
+                lambda: agent_module.CopilotAgent(actor_id=actor_id, session_id=session_id)
             )
-        
-        agent = agent_cache[cache_key]
-        
-        # Process the message using existing agent logic
-        response = agent.chat(user_input)
-        
-        return response
-        
+            request_timings = {
+                "queue_ms": int((acquired_at - queued_at) * 1000),
+                "agent_ms": int((time.perf_counter() - acquired_at) * 1000)
+            }
+
+            if prefetch:
+                # Warm agent is cached for this session, the next message skips the restore
+                yield {"metadata": {"prefetched": True, "timings": request_timings}}
+                return
+
+            # Process the message using existing agent logic
+            if stream:
+                async for chunk in agent.stream_chat(user_input):
+                    yield chunk
+            else:
+                yield await agent_module.run_blocking(agent.chat, user_input)
+
+            # Trailing metadata event; text-only clients ignore it
+            if stream or include_timings:
+                metadata = {"usage": agent.last_usage}
+                if agent.last_cache_hit:
+                    metadata["cached"] = True
+                if include_timings:
+                    metadata["timings"] = {**request_timings, **agent.last_timings}
+                yield {"metadata": metadata}
+
+            # Conversation grew, re-check the byte ceiling (sizing and evicted agents' memory flushes block)
+            await agent_module.run_blocking(agent_cache.touch, cache_key)
+
+    except SessionBusyError as e:
+        yield f"Error: session is busy, please retry shortly ({str(e)})"
     except Exception as e:
-        return f"Error processing request: {str(e)}"
+        yield f"Error processing request: {str(e)}"
 
 if __name__ == "__main__":
-    app.run()
\ No newline at end of file
+    warmup.start()
+    app.run()
@@ -0,0 +1,81 @@
+"""
+Benchmark: agent construction time and per-agent memory footprint
+
+Compares building the session-independent parts (Bedrock model, tool list) for
+every agent against reusing the process-wide shared instances. When MEMORY_ID
+is configured in agent.py, also measures full CopilotAgent construction,
+which includes the AgentCore memory session restore.
+
+Usage: python benchmarks/bench_agent_construction.py [agents]
+"""
+import os
+import sys
+import time
+import tracemalloc
+import uuid
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+import agent as agent_module  # noqa: E402
+from strands import Agent  # noqa: E402
+from strands.models import BedrockModel  # noqa: E402
+
+
+def per_agent_model() -> BedrockModel:
+    # What every CopilotAgent used to build for itself
+    return BedrockModel(
+        model_id=agent_module.BEDROCK_MODEL_ID,
+        guardrail_id=agent_module.GUARDRAIL_ID,
+        guardrail_version=agent_module.GUARDRAIL_VERSION,
+        guardrail_trace=agent_module.GUARDRAIL_TRACE,
+        region_name=agent_module.REGION
+    )
+
+
+def build_agent(model: BedrockModel) -> Agent:
+    return Agent(
+        system_prompt=agent_module.build_system_prompt("bench_user"),
+        model=model,
+        tools=list(agent_module.TOOLS),
+        callback_handler=None
+    )
+
+
+def measure(label, factory, count):
+    # Warm-up so one-time imports and caches are not attributed to the first agent
+    factory()
+
+    tracemalloc.start()
+    baseline, _ = tracemalloc.get_traced_memory()
+    keep = []
+    start = time.perf_counter()
+    for _ in range(count):
+        keep.append(factory())
+    elapsed = time.perf_counter() - start
+    current, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    print(
+        f"{label:<32} {elapsed / count * 1000:8.2f} ms/agent  "
+        f"{(current - baseline) / count / 1024:8.1f} KiB/agent"
+    )
+    return keep
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 50
+
+    measure("model + tools per agent", lambda: build_agent(per_agent_model()), count)
+    measure("shared model + tools", lambda: build_agent(agent_module.get_shared_model()), count)
+
+    if agent_module.MEMORY_ID:
+        measure(
+            "CopilotAgent (with memory)",
+            lambda: agent_module.CopilotAgent(actor_id="bench_user", session_id=str(uuid.uuid4())),
+            max(1, count // 10)
+        )
+    else:
+        print("MEMORY_ID not set, skipping full CopilotAgent construction")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,57 @@
+"""
+Micro-benchmark: per-call overhead of building a boto3 client vs. the shared registry
+
+Each iteration issues a stubbed bedrock-agentcore list_sessions call, so the numbers
+measure client construction and request handling without network latency.
+
+Usage: python benchmarks/bench_clients.py [iterations]
+"""
+import os
+import sys
+import time
+
+import boto3
+from botocore.stub import Stubber
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+from clients import get_client  # noqa: E402
+
+REGION = 'us-east-1'
+PARAMS = {'memoryId': 'bench-memory', 'actorId': 'bench_user'}
+RESPONSE = {'sessionSummaries': []}
+
+# Dummy credentials so the benchmark runs without an AWS profile
+os.environ.setdefault('AWS_ACCESS_KEY_ID', 'bench')
+os.environ.setdefault('AWS_SECRET_ACCESS_KEY', 'bench')
+
+
+def stubbed_call(client):
+    with Stubber(client) as stubber:
+        stubber.add_response('list_sessions', RESPONSE, PARAMS)
+        client.list_sessions(**PARAMS)
+
+
+def bench(label, make_client, iterations):
+    # Warm-up call outside the timed loop
+    stubbed_call(make_client())
+
+    start = time.perf_counter()
+    for _ in range(iterations):
+        stubbed_call(make_client())
+    elapsed = time.perf_counter() - start
+
+    print(f"{label:<28} {elapsed / iterations * 1000:8.3f} ms/call  ({iterations} calls, {elapsed:.2f}s)")
+    return elapsed
+
+
+def main():
+    iterations = int(sys.argv[1]) if len(sys.argv) > 1 else 200
+
+    before = bench("boto3.client per call", lambda: boto3.client('bedrock-agentcore', region_name=REGION), iterations)
+    after = bench("shared get_client", lambda: get_client('bedrock-agentcore', REGION), iterations)
+
+    print(f"speedup: {before / after:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
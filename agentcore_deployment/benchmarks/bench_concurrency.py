@@ -0,0 +1,104 @@
+"""
+Concurrency benchmark: throughput as the number of in-flight sessions grows
+
+Modes:
+  runtime  POST to a running runtime (python -m agentcore_runtime, or the container)
+           with one distinct session per in-flight request.
+  tools    Call the async knowledge_base_search tool in-process with distinct
+           queries, so every call is a real (uncached) retrieval.
+
+Throughput should scale with concurrency until the backends saturate. A flat
+requests/s line means work is being serialized somewhere.
+
+Usage:
+  python benchmarks/bench_concurrency.py runtime [--url http://localhost:8080/invocations]
+  python benchmarks/bench_concurrency.py tools
+"""
+import argparse
+import asyncio
+import json
+import os
+import statistics
+import sys
+import time
+import urllib.request
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+LEVELS = [1, 2, 4, 8, 16]
+
+
+def invoke_runtime(url: str, prompt: str) -> float:
+    session_id = str(uuid.uuid4())
+    body = json.dumps({
+        "prompt": prompt,
+        "actor_id": "bench_user",
+        "session_id": session_id,
+        "stream": False
+    }).encode('utf-8')
+    request = urllib.request.Request(url, data=body, headers={
+        'Content-Type': 'application/json',
+        'X-Amzn-Bedrock-AgentCore-Runtime-Session-Id': session_id
+    })
+    start = time.perf_counter()
+    with urllib.request.urlopen(request, timeout=300) as response:
+        response.read()
+    return time.perf_counter() - start
+
+
+def bench_runtime(url: str, prompt: str, rounds: int):
+    for level in LEVELS:
+        total = level * rounds
+        start = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=level) as pool:
+            latencies = list(pool.map(lambda _: invoke_runtime(url, prompt), range(total)))
+        report(level, total, time.perf_counter() - start, latencies)
+
+
+async def timed(coro) -> float:
+    start = time.perf_counter()
+    await coro
+    return time.perf_counter() - start
+
+
+async def bench_tools(rounds: int):
+    from agent import knowledge_base_search
+
+    for level in LEVELS:
+        latencies = []
+        start = time.perf_counter()
+        for round_index in range(rounds):
+            latencies += await asyncio.gather(*[
+                timed(knowledge_base_search(f"what is agentic memory {level}-{round_index}-{i}"))
+                for i in range(level)
+            ])
+        report(level, level * rounds, time.perf_counter() - start, latencies)
+
+
+def report(level: int, total: int, elapsed: float, latencies):
+    print(
+        f"in-flight={level:<3} requests={total:<4} "
+        f"throughput={total / elapsed:7.2f} req/s  "
+        f"p50={statistics.median(latencies) * 1000:8.1f} ms  "
+        f"max={max(latencies) * 1000:8.1f} ms"
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('mode', choices=['runtime', 'tools'])
+    parser.add_argument('--url', default='http://localhost:8080/invocations')
+    parser.add_argument('--prompt', default='Say hello in one short sentence.')
+    parser.add_argument('--rounds', type=int, default=3)
+    args = parser.parse_args()
+
+    if args.mode == 'runtime':
+        bench_runtime(args.url, args.prompt, args.rounds)
+    else:
+        asyncio.run(bench_tools(args.rounds))
+
+
+if __name__ == "__main__":
+    main()
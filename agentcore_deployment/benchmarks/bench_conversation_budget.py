@@ -0,0 +1,102 @@
+"""
+Benchmark: per-turn input tokens over a long session, with and without the token budget
+
+Offline mode (default) replays a synthetic 100-turn session in which every
+third turn calls a tool with a large result. Summaries are produced locally
+with a fixed size instead of calling the model, so only the windowing logic is
+measured. Live mode sends real turns through a Strands agent on the configured
+Bedrock model and reports the inputTokens Bedrock actually billed.
+
+Usage:
+  python benchmarks/bench_conversation_budget.py [--turns 100] [--budget 8000]
+  python benchmarks/bench_conversation_budget.py --live [--turns 100]
+"""
+import argparse
+import asyncio
+import os
+import sys
+from types import SimpleNamespace
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+from conversation_budget import TokenBudgetConversationManager, estimate_tokens  # noqa: E402
+
+SUMMARY_TEXT = "Summary of earlier conversation: " + "key facts and decisions. " * 40
+
+
+class OfflineBudgetManager(TokenBudgetConversationManager):
+    """Budget manager whose summaries are built locally instead of by the model"""
+
+    def _generate_summary(self, messages, agent):
+        return {'role': 'user', 'content': [{'text': SUMMARY_TEXT}]}
+
+
+def synthetic_turn(turn: int):
+    messages = [{'role': 'user', 'content': [{'text': f"Question {turn}: " + "tell me more about agentic memory. " * 10}]}]
+    if turn % 3 == 0:
+        tool_use_id = f"tool-{turn}"
+        messages += [
+            {'role': 'assistant', 'content': [{'toolUse': {'toolUseId': tool_use_id, 'name': 'knowledge_base_search', 'input': {'query': 'agentic memory'}}}]},
+            {'role': 'user', 'content': [{'toolResult': {'toolUseId': tool_use_id, 'status': 'success', 'content': [{'text': "retrieved passage " * 400}]}}]},
+        ]
+    messages.append({'role': 'assistant', 'content': [{'text': "Here is what I found. " * 60}]})
+    return messages
+
+
+def run_offline(turns: int, manager):
+    agent = SimpleNamespace(messages=[])
+    per_turn = []
+    for turn in range(turns):
+        new_messages = synthetic_turn(turn)
+        agent.messages.append(new_messages[0])
+        if manager:
+            manager.enforce_budget(agent)
+        # Input tokens of the first model call of the turn
+        per_turn.append(estimate_tokens(agent.messages))
+        agent.messages.extend(new_messages[1:])
+        if manager:
+            manager.apply_management(agent)
+    return per_turn
+
+
+def run_live(turns: int, budget: int):
+    from strands import Agent
+    import agent as agent_module
+
+    agent = Agent(
+        system_prompt=agent_module.build_system_prompt("bench_user"),
+        model=agent_module.get_shared_model(),
+        tools=agent_module.TOOLS,
+        conversation_manager=TokenBudgetConversationManager(max_tokens=budget),
+        callback_handler=None
+    )
+    per_turn = []
+    for turn in range(turns):
+        # The budget's summary hook is async, like the runtime's invocation path
+        result = asyncio.run(agent.invoke_async(f"Turn {turn}: in two sentences, what is one more aspect of agentic AI memory?"))
+        per_turn.append(result.metrics.accumulated_usage.get('inputTokens', 0))
+    return per_turn
+
+
+def report(label, per_turn):
+    checkpoints = [i for i in (0, 9, 24, 49, 74, 99) if i < len(per_turn)]
+    columns = "  ".join(f"t{i + 1}={per_turn[i]:>6}" for i in checkpoints)
+    print(f"{label:<16} {columns}  max={max(per_turn):>6}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--turns', type=int, default=100)
+    parser.add_argument('--budget', type=int, default=8000)
+    parser.add_argument('--live', action='store_true', help="use the configured Bedrock model")
+    args = parser.parse_args()
+
+    print("estimated input tokens per turn" if not args.live else "billed input tokens per turn")
+    if args.live:
+        report(f"budget={args.budget}", run_live(args.turns, args.budget))
+    else:
+        report("unbounded", run_offline(args.turns, None))
+        report(f"budget={args.budget}", run_offline(args.turns, OfflineBudgetManager(max_tokens=args.budget)))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,101 @@
+"""
+Startup benchmark: import-time breakdown and time-to-first-response
+
+Every measurement runs in a fresh interpreter so results are reproducible:
+  1. `python -X importtime` for the runtime module and for agent.py, with the
+     slowest top-level imports listed.
+  2. Launch `python -m agentcore_runtime`, then time until /ping answers and
+     until the first byte of an /invocations response arrives.
+
+The runtime listens on port 8080, which must be free.
+
+Usage: python benchmarks/bench_startup.py [--top 10] [--skip-server]
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+import time
+import urllib.error
+import urllib.request
+import uuid
+
+APP_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")
+
+
+def import_breakdown(module: str, top: int):
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=APP_DIR, capture_output=True, text=True
+    )
+    rows = []
+    for line in result.stderr.splitlines():
+        # Format: "import time: <self us> | <cumulative us> | <indented module name>"
+        if not line.startswith("import time:"):
+            continue
+        _, cumulative_us, name = line[len("import time:"):].split("|")
+        if not cumulative_us.strip().isdigit():
+            continue
+        depth = (len(name) - len(name.lstrip()) - 1) // 2
+        rows.append((depth, int(cumulative_us), name.strip()))
+
+    total = next((cumulative for depth, cumulative, name in rows if name == module), 0)
+    print(f"\nimport {module}: {total / 1e6:.3f}s")
+    # Slowest imports made directly by the module
+    top_level = sorted((row for row in rows if row[0] == 1), key=lambda row: -row[1])[:top]
+    for _, cumulative, name in top_level:
+        print(f"  {cumulative / 1e6:7.3f}s  {name}")
+
+
+def wait_for(url: str, deadline: float, data: bytes = None, headers: dict = None) -> float:
+    while time.perf_counter() < deadline:
+        try:
+            request = urllib.request.Request(url, data=data, headers=headers or {})
+            with urllib.request.urlopen(request, timeout=300) as response:
+                response.read(1)
+                return time.perf_counter()
+        except (urllib.error.URLError, ConnectionError):
+            time.sleep(0.02)
+    raise TimeoutError(f"{url} did not respond in time")
+
+
+def time_to_first_response():
+    base = "http://127.0.0.1:8080"
+    session_id = str(uuid.uuid4())
+    payload = json.dumps({"prompt": "Hello", "actor_id": "bench_user", "session_id": session_id}).encode('utf-8')
+    headers = {
+        'Content-Type': 'application/json',
+        'X-Amzn-Bedrock-AgentCore-Runtime-Session-Id': session_id
+    }
+
+    start = time.perf_counter()
+    process = subprocess.Popen(
+        [sys.executable, "-m", "agentcore_runtime"],
+        cwd=APP_DIR, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
+    )
+    try:
+        ping_at = wait_for(f"{base}/ping", start + 60)
+        first_byte_at = wait_for(f"{base}/invocations", start + 600, payload, headers)
+    finally:
+        process.terminate()
+        process.wait()
+
+    print(f"\ntime to first /ping:          {ping_at - start:.3f}s")
+    print(f"time to first response byte:  {first_byte_at - start:.3f}s")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--top', type=int, default=10)
+    parser.add_argument('--skip-server', action='store_true', help="only report import times")
+    args = parser.parse_args()
+
+    import_breakdown("agentcore_runtime", args.top)
+    import_breakdown("agent", args.top)
+    if not args.skip_server:
+        time_to_first_response()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,162 @@
+"""
+Benchmark: local vector index tier vs the remote knowledge base
+
+Offline mode (default) builds a synthetic clustered corpus of unit vectors.
+The "remote" knowledge base is an exact search over the whole corpus and the
+local index only holds the chunks returned by earlier queries, as it would
+when populated from past retrieval results. Queries are embedded by a fake
+embedder, so only the index itself is measured: open time (memory-mapped vs
+fully loaded), search latency, the share of queries answered locally and
+their recall@k against the remote answer.
+
+Live mode reads one query per line, calls the real knowledge base and the
+local index at KB_LOCAL_INDEX_PATH for each, and reports latency of both
+paths (the local one includes the query embedding call) and recall@k of the
+locally answered queries.
+
+Usage:
+  python benchmarks/bench_vector_index.py [--chunks 50000] [--queries 500] [--k 8]
+  python benchmarks/bench_vector_index.py --live queries.txt [--k 8]
+"""
+import argparse
+import os
+import statistics
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+from vector_index import VECTORS_FILE, VectorIndex, chunk_id  # noqa: E402
+
+DIMENSIONS = 512
+
+
+def percentile(values, pct):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * pct / 100))] if values else 0.0
+
+
+def report(name, latencies_ms):
+    print(f"  {name:<28} p50={percentile(latencies_ms, 50):8.2f} ms  p95={percentile(latencies_ms, 95):8.2f} ms")
+
+
+def recall(local, remote, k):
+    remote_ids = {chunk_id(result) for result in remote[:k]}
+    return len(remote_ids & {chunk_id(result) for result in local[:k]}) / len(remote_ids) if remote_ids else 1.0
+
+
+def unit(vectors):
+    return (vectors / np.linalg.norm(vectors, axis=-1, keepdims=True)).astype(np.float32)
+
+
+def noise(rng, scale, rows):
+    """Random offsets of roughly ``scale`` length"""
+    return scale * rng.normal(size=(rows, DIMENSIONS)) / np.sqrt(DIMENSIONS)
+
+
+def run_offline(chunks, queries, k, threshold):
+    rng = np.random.default_rng(7)
+    topics = unit(rng.normal(size=(max(1, chunks // 50), DIMENSIONS)))
+    corpus = unit(topics[rng.integers(len(topics), size=chunks)] + noise(rng, 0.6, chunks))
+    results = [{'content': {'text': f"chunk {i}"}, 'location': {'s3Location': {'uri': f"s3://kb/doc-{i // 10}"}}} for i in range(chunks)]
+    # Users keep asking about a small set of popular topics
+    popular = rng.choice(len(topics), size=max(1, len(topics) // 20), replace=False)
+    # Fake embedder: chunk texts map to their corpus vector, queries to their own
+    query_vectors = {result['content']['text']: corpus[i] for i, result in enumerate(results)}
+
+    def make_query(i):
+        topic = popular[rng.integers(len(popular))] if rng.random() < 0.8 else rng.integers(len(topics))
+        query_vectors[f"q{i}"] = unit(topics[topic] + noise(rng, 0.3, 1)[0])
+        return f"q{i}"
+
+    def remote(query):
+        scores = corpus @ query_vectors[query]
+        return [{**results[i], 'score': float(scores[i])} for i in np.argsort(-scores)[:k]]
+
+    with tempfile.TemporaryDirectory() as path:
+        index = VectorIndex(path, embed=lambda query: query_vectors[query], min_similarity=threshold, persist_every=10 ** 9)
+        warmup = [make_query(i) for i in range(queries)]
+        for query in warmup:
+            index._add(remote(query))
+        index.save()
+        print(f"Offline: {chunks} corpus chunks, {len(index)} indexed from {queries} past queries, k={k}, threshold={threshold}")
+
+        vectors_path = os.path.join(path, VECTORS_FILE)
+        start = time.perf_counter()
+        np.load(vectors_path, mmap_mode='r')
+        mmap_ms = (time.perf_counter() - start) * 1000
+        start = time.perf_counter()
+        np.load(vectors_path)
+        load_ms = (time.perf_counter() - start) * 1000
+        start = time.perf_counter()
+        VectorIndex(path, embed=index.embed)
+        open_ms = (time.perf_counter() - start) * 1000
+        print(f"  vectors memory-mapped: {mmap_ms:.2f} ms, fully loaded: {load_ms:.2f} ms; index open (with passages): {open_ms:.2f} ms")
+
+        local_ms, remote_ms, recalls = [], [], []
+        for i in range(queries):
+            query = make_query(queries + i)
+            start = time.perf_counter()
+            local = index.search(query, k)
+            local_ms.append((time.perf_counter() - start) * 1000)
+            start = time.perf_counter()
+            exact = remote(query)
+            remote_ms.append((time.perf_counter() - start) * 1000)
+            if local is not None:
+                recalls.append(recall(local, exact, k))
+
+    report("local search", local_ms)
+    report("exact search (full corpus)", remote_ms)
+    print(f"  answered locally: {len(recalls)}/{queries}, recall@{k} of local answers: {statistics.mean(recalls) if recalls else 0:.3f}")
+
+
+def run_live(queries_path, k):
+    import agent
+
+    if agent.kb_local_index is None:
+        sys.exit("Set KB_LOCAL_INDEX_PATH to benchmark the local index")
+    index = agent.kb_local_index
+    client = agent.get_client('bedrock-agent-runtime', agent.REGION)
+    with open(queries_path) as f:
+        queries = [line.strip() for line in f if line.strip()]
+
+    local_ms, remote_ms, recalls = [], [], []
+    for query in queries:
+        start = time.perf_counter()
+        local = index.search(query, k)
+        local_ms.append((time.perf_counter() - start) * 1000)
+        start = time.perf_counter()
+        response = client.retrieve(
+            knowledgeBaseId=agent.KNOWLEDGE_BASE_ID,
+            retrievalQuery={'text': query},
+            retrievalConfiguration={'vectorSearchConfiguration': {'numberOfResults': k}}
+        )
+        remote_ms.append((time.perf_counter() - start) * 1000)
+        if local is not None:
+            recalls.append(recall(local, response.get('retrievalResults', []), k))
+
+    print(f"Live: {len(queries)} queries against {len(index)} indexed chunks, k={k}, threshold={index.min_similarity}")
+    report("local (embed + search)", local_ms)
+    report("remote retrieve", remote_ms)
+    print(f"  answered locally: {len(recalls)}/{len(queries)}, recall@{k} of local answers: {statistics.mean(recalls) if recalls else 0:.3f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--chunks', type=int, default=50000)
+    parser.add_argument('--queries', type=int, default=500)
+    parser.add_argument('--k', type=int, default=8)
+    parser.add_argument('--threshold', type=float, default=0.75)
+    parser.add_argument('--live', metavar='QUERIES_FILE')
+    args = parser.parse_args()
+
+    if args.live:
+        run_live(args.live, args.k)
+    else:
+        run_offline(args.chunks, args.queries, args.k, args.threshold)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,87 @@
+"""
+Shared boto3 client registry
+One pooled, thread-safe client per (service, region) for all Bedrock/AgentCore call sites
+"""
+import os
+import threading
+from typing import Dict, Optional, Tuple
+
+import boto3
+from botocore.config import Config
+
+DEFAULT_REGION = os.getenv("AWS_REGION", "us-east-1")
+
+# Connection pool and timeout tuning (override via environment)
+MAX_POOL_CONNECTIONS = int(os.getenv("BOTO_MAX_POOL_CONNECTIONS", "50"))
+CONNECT_TIMEOUT = float(os.getenv("BOTO_CONNECT_TIMEOUT", "5"))
+READ_TIMEOUT = float(os.getenv("BOTO_READ_TIMEOUT", "60"))
+MAX_ATTEMPTS = int(os.getenv("BOTO_MAX_ATTEMPTS", "4"))
+
+# Services whose calls can legitimately run long (agent invocations stream for minutes)
+SERVICE_READ_TIMEOUTS = {
+    'bedrock-agentcore': 300,
+    'bedrock-runtime': 300,
+}
+
+_clients: Dict[Tuple[str, str, float], object] = {}
+_session: Optional[boto3.session.Session] = None
+_lock = threading.Lock()
+_thread_sessions = threading.local()
+
+
+def client_config(service_name: str, read_timeout: Optional[float] = None) -> Config:
+    """Build the tuned botocore config used for a service"""
+    return Config(
+        max_pool_connections=MAX_POOL_CONNECTIONS,
+        tcp_keepalive=True,
+        connect_timeout=CONNECT_TIMEOUT,
+        read_timeout=read_timeout or SERVICE_READ_TIMEOUTS.get(service_name, READ_TIMEOUT),
+        retries={'max_attempts': MAX_ATTEMPTS, 'mode': 'adaptive'}
+    )
+
+
+def get_client(service_name: str, region_name: Optional[str] = None, read_timeout: Optional[float] = None):
+    """Get the shared client for a service and region, creating it on first use"""
+    region = region_name or DEFAULT_REGION
+    config = client_config(service_name, read_timeout)
+    key = (service_name, region, config.read_timeout)
+
+    client = _clients.get(key)
+    if client is not None:
+        return client
+
+    with _lock:
+        client = _clients.get(key)
+        if client is None:
+            # boto3 sessions are not thread-safe, so clients are only created under the lock
+            global _session
+            if _session is None:
+                _session = boto3.session.Session()
+            client = _session.client(service_name, region_name=region, config=config)
+            _clients[key] = client
+        return client
+
+
+def get_session(region_name: Optional[str] = None) -> boto3.session.Session:
+    """Get a boto3 session for the calling thread
+
+    For libraries that build their own clients from a session. Reusing one
+    session per thread keeps its service-model cache warm while staying
+    thread-safe, since sessions must not be shared across threads.
+    """
+    region = region_name or DEFAULT_REGION
+    sessions = getattr(_thread_sessions, 'sessions', None)
+    if sessions is None:
+        sessions = _thread_sessions.sessions = {}
+    session = sessions.get(region)
+    if session is None:
+        session = sessions[region] = boto3.session.Session(region_name=region)
+    return session
+
+
+def reset_clients():
+    """Drop all cached clients, e.g. after credentials change"""
+    global _session
+    with _lock:
+        _clients.clear()
+        _session = None
@@ -0,0 +1,127 @@
+"""
+Token-budgeted conversation window for long-running sessions
+Keeps the history sent to Bedrock under a fixed token budget by pruning old
+tool results first, then folding the oldest turns into a rolling summary
+"""
+import asyncio
+import json
+import logging
+from typing import Any, Dict, List, Optional
+
+from strands.agent.conversation_manager import SummarizingConversationManager
+from strands.hooks import BeforeInvocationEvent, BeforeModelCallEvent, HookRegistry
+from strands.types.content import Message
+
+logger = logging.getLogger(__name__)
+
+# Rough characters-per-token ratio for English text and JSON tool payloads
+CHARS_PER_TOKEN = 4
+
+PRUNED_TOOL_RESULT = "[Earlier tool result removed to save context]"
+
+
+def estimate_tokens(messages: List[Message]) -> int:
+    """Estimate the input tokens a list of messages will cost"""
+    return len(json.dumps(messages, default=str)) // CHARS_PER_TOKEN
+
+
+class TokenBudgetConversationManager(SummarizingConversationManager):
+    """Conversation manager that enforces an explicit token budget
+
+    Before every model call the restored and accumulated history is checked
+    against ``max_tokens``. Over budget, tool results older than the
+    ``preserve_recent_messages`` window are replaced with a placeholder; if
+    the history is still over budget, the oldest messages (including any
+    previous summary) are folded into a summary, at most once per turn. The
+    summary is a blocking model call, so it runs on a worker thread and the
+    agent must be invoked through its async path. The summary is kept in the
+    conversation manager state, so it is restored with the session.
+    """
+
+    def __init__(
+        self,
+        max_tokens: int = 8000,
+        preserve_recent_messages: int = 10,
+        summary_ratio: float = 0.5,
+        **kwargs: Any
+    ):
+        super().__init__(
+            summary_ratio=summary_ratio,
+            preserve_recent_messages=preserve_recent_messages,
+            **kwargs
+        )
+        self.max_tokens = max_tokens
+        self.pruned_tool_results = 0
+        self.summarizations = 0
+        self._summarized_this_turn = False
+
+    def restore_from_session(self, state: Dict[str, Any]) -> Optional[List[Message]]:
+        if state.get("__name__") != self.__class__.__name__:
+            # Session saved before the budget manager was enabled; keep its offset only
+            self.removed_message_count = state.get("removed_message_count", 0)
+            return None
+        return super().restore_from_session(state)
+
+    def register_hooks(self, registry: HookRegistry, **kwargs: Any) -> None:
+        super().register_hooks(registry, **kwargs)
+        registry.add_callback(BeforeInvocationEvent, self._on_before_invocation_budget)
+        registry.add_callback(BeforeModelCallEvent, self._on_before_model_call_budget)
+
+    def apply_management(self, agent: "Any", **kwargs: Any) -> None:
+        """Prune old tool results at the end of an invocation (runs on the event loop, so no model calls)"""
+        self.prune_over_budget(agent)
+
+    def prune_over_budget(self, agent: "Any") -> bool:
+        """Prune old tool results if over budget; returns whether a summary is still needed"""
+        if estimate_tokens(agent.messages) <= self.max_tokens:
+            return False
+        self._prune_tool_results(agent.messages)
+        return estimate_tokens(agent.messages) > self.max_tokens and len(agent.messages) > self.preserve_recent_messages
+
+    def enforce_budget(self, agent: "Any") -> None:
+        """Prune, then summarize once if still over budget (blocks on the summary model call)"""
+        if self.prune_over_budget(agent):
+            self._summarize_once(agent)
+
+    def get_budget_stats(self) -> Dict[str, Any]:
+        """Get budget configuration and how often it had to intervene"""
+        return {
+            'max_tokens': self.max_tokens,
+            'pruned_tool_results': self.pruned_tool_results,
+            'summarizations': self.summarizations,
+            'removed_message_count': self.removed_message_count
+        }
+
+    def _on_before_invocation_budget(self, event: BeforeInvocationEvent) -> None:
+        self._summarized_this_turn = False
+
+    async def _on_before_model_call_budget(self, event: BeforeModelCallEvent) -> None:
+        # Also covers the first call after a long history was restored from memory
+        if not self.prune_over_budget(event.agent) or self._summarized_this_turn:
+            return
+        self._summarized_this_turn = True
+        # The agent's loop is suspended on this hook, so its messages are not touched meanwhile
+        await asyncio.to_thread(self._summarize_once, event.agent)
+
+    def _summarize_once(self, agent: "Any") -> None:
+        try:
+            self._summarize_oldest(agent)
+            self.summarizations += 1
+        except Exception as e:
+            logger.warning("Conversation summarization failed, sending history as is: %s", e)
+
+    def _prune_tool_results(self, messages: List[Message]) -> None:
+        # Tool results are the bulkiest and least reusable part of old turns
+        cutoff = max(0, len(messages) - self.preserve_recent_messages)
+        for message in messages[:cutoff]:
+            for block in message.get('content', []):
+                tool_result = block.get('toolResult')
+                if not tool_result or self._is_pruned(tool_result):
+                    continue
+                tool_result['content'] = [{'text': PRUNED_TOOL_RESULT}]
+                self.pruned_tool_results += 1
+
+    @staticmethod
+    def _is_pruned(tool_result: Dict[str, Any]) -> bool:
+        content: Optional[List[Dict[str, Any]]] = tool_result.get('content')
+        return bool(content) and content[0].get('text') == PRUNED_TOOL_RESULT
@@ -0,0 +1,391 @@
+"""
+Per-actor token usage and cost metering
+Aggregates one record per agent turn by actor and session in memory and
+periodically flushes the records to a local SQLite database. The runtime
+answers usage queries against it, which the Settings page uses to find the
+sessions and prompts that dominate spend
+"""
+import atexit
+import json
+import os
+import sqlite3
+import tempfile
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional, Tuple
+
+DEFAULT_DB_PATH = os.path.join(tempfile.gettempdir(), 'copilot_usage.db')
+
+# USD per million tokens for models not in MODEL_PRICES, defaults match Claude Sonnet on-demand pricing
+PRICE_INPUT = float(os.getenv('METERING_PRICE_INPUT', '3.0'))
+PRICE_OUTPUT = float(os.getenv('METERING_PRICE_OUTPUT', '15.0'))
+PRICE_CACHE_READ = float(os.getenv('METERING_PRICE_CACHE_READ', '0.30'))
+PRICE_CACHE_WRITE = float(os.getenv('METERING_PRICE_CACHE_WRITE', '3.75'))
+
+# On-demand (input, output, cache read, cache write) USD per million tokens, matched
+# against Bedrock model IDs by substring in this order (inference profile prefixes and
+# version suffixes vary)
+MODEL_PRICES = (
+    ('claude-opus-4', (15.0, 75.0, 1.50, 18.75)),
+    ('claude-sonnet-4', (3.0, 15.0, 0.30, 3.75)),
+    ('claude-3-7-sonnet', (3.0, 15.0, 0.30, 3.75)),
+    ('claude-3-5-sonnet', (3.0, 15.0, 0.30, 3.75)),
+    ('claude-haiku-4', (1.0, 5.0, 0.10, 1.25)),
+    ('claude-3-5-haiku', (0.80, 4.0, 0.08, 1.0)),
+    ('claude-3-haiku', (0.25, 1.25, 0.03, 0.30)),
+    ('nova-pro', (0.80, 3.20, 0.20, 0.0)),
+    ('nova-lite', (0.06, 0.24, 0.015, 0.0)),
+    ('nova-micro', (0.035, 0.14, 0.00875, 0.0)),
+)
+
+# Characters of the user prompt kept with each turn record
+PROMPT_PREVIEW_CHARS = 200
+
+COUNTERS = (
+    'turns', 'input_tokens', 'output_tokens', 'cache_read_tokens', 'cache_write_tokens',
+    'cycles', 'tool_calls', 'latency_ms', 'cost'
+)
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS turns (
+    ts REAL NOT NULL,
+    actor_id TEXT NOT NULL,
+    session_id TEXT NOT NULL,
+    prompt TEXT,
+    input_tokens INTEGER,
+    output_tokens INTEGER,
+    cache_read_tokens INTEGER,
+    cache_write_tokens INTEGER,
+    cycles INTEGER,
+    tool_calls INTEGER,
+    tools TEXT,
+    latency_ms INTEGER,
+    cost REAL,
+    model_id TEXT
+);
+CREATE INDEX IF NOT EXISTS turns_actor_session ON turns (actor_id, session_id);
+CREATE INDEX IF NOT EXISTS turns_ts ON turns (ts);
+"""
+
+_COLUMNS = (
+    'ts', 'actor_id', 'session_id', 'prompt', 'input_tokens', 'output_tokens', 'cache_read_tokens',
+    'cache_write_tokens', 'cycles', 'tool_calls', 'tools', 'latency_ms', 'cost', 'model_id'
+)
+
+# Sort keys accepted by the query API, mapped to SQL aggregates
+_ORDER_BY = {
+    'cost': 'cost',
+    'tokens': 'input_tokens + output_tokens',
+    'latency': 'latency_ms',
+    'turns': 'turns'
+}
+
+
+def model_prices(model_id: Optional[str] = None) -> Tuple[float, float, float, float]:
+    """(input, output, cache read, cache write) USD per million tokens for a model"""
+    for fragment, prices in MODEL_PRICES:
+        if model_id and fragment in model_id:
+            return prices
+    return PRICE_INPUT, PRICE_OUTPUT, PRICE_CACHE_READ, PRICE_CACHE_WRITE
+
+
+def estimate_cost(
+    input_tokens: int,
+    output_tokens: int,
+    cache_read_tokens: int = 0,
+    cache_write_tokens: int = 0,
+    model_id: Optional[str] = None
+) -> float:
+    """Estimate the USD cost of a turn from its token counts and the model that served it"""
+    price_input, price_output, price_cache_read, price_cache_write = model_prices(model_id)
+    return (
+        input_tokens * price_input
+        + output_tokens * price_output
+        + cache_read_tokens * price_cache_read
+        + cache_write_tokens * price_cache_write
+    ) / 1_000_000
+
+
+class UsageStore:
+    """SQLite sink for turn records, plus the queries behind the Settings page"""
+
+    def __init__(self, db_path: str = DEFAULT_DB_PATH):
+        self.db_path = db_path
+
+    def exists(self) -> bool:
+        return os.path.exists(self.db_path)
+
+    def write(self, records: List[Dict[str, Any]]) -> None:
+        """Append turn records in a single transaction"""
+        rows = [
+            tuple(json.dumps(record[column]) if column == 'tools' else record[column] for column in _COLUMNS)
+            for record in records
+        ]
+        with self._connect() as connection:
+            connection.executemany(
+                f"INSERT INTO turns ({', '.join(_COLUMNS)}) VALUES ({', '.join('?' * len(_COLUMNS))})",
+                rows
+            )
+
+    def actor_totals(self, since: Optional[float] = None, order_by: str = 'cost') -> List[Dict[str, Any]]:
+        """Totals per actor, most expensive first"""
+        return self._aggregate(['actor_id'], since=since, order_by=order_by)
+
+    def top_sessions(
+        self,
+        actor_id: Optional[str] = None,
+        since: Optional[float] = None,
+        order_by: str = 'cost',
+        limit: int = 10
+    ) -> List[Dict[str, Any]]:
+        """Sessions that dominate spend (or tokens, latency, turns)"""
+        return self._aggregate(['actor_id', 'session_id'], actor_id=actor_id, since=since, order_by=order_by, limit=limit)
+
+    def top_turns(
+        self,
+        actor_id: Optional[str] = None,
+        since: Optional[float] = None,
+        order_by: str = 'cost',
+        limit: int = 10
+    ) -> List[Dict[str, Any]]:
+        """Individual turns (with their prompt) that dominate spend or latency"""
+        where, params = self._where(actor_id, since)
+        # A single turn has no turn count to rank by
+        order = _ORDER_BY.get(order_by, 'cost') if order_by != 'turns' else 'cost'
+        query = f"SELECT * FROM turns {where} ORDER BY {order} DESC LIMIT ?"
+        with self._connect() as connection:
+            rows = connection.execute(query, params + [limit]).fetchall()
+        records = [dict(row) for row in rows]
+        for record in records:
+            record['tools'] = json.loads(record['tools'] or '{}')
+        return records
+
+    def _aggregate(
+        self,
+        group_by: List[str],
+        actor_id: Optional[str] = None,
+        since: Optional[float] = None,
+        order_by: str = 'cost',
+        limit: Optional[int] = None
+    ) -> List[Dict[str, Any]]:
+        where, params = self._where(actor_id, since)
+        columns = ', '.join(group_by)
+        query = (
+            f"SELECT {columns}, COUNT(*) AS turns, COUNT(DISTINCT session_id) AS sessions, "
+            "SUM(input_tokens) AS input_tokens, SUM(output_tokens) AS output_tokens, "
+            "SUM(cache_read_tokens) AS cache_read_tokens, SUM(cache_write_tokens) AS cache_write_tokens, "
+            "SUM(cycles) AS cycles, SUM(tool_calls) AS tool_calls, SUM(latency_ms) AS latency_ms, "
+            "MAX(latency_ms) AS max_latency_ms, SUM(cost) AS cost, MAX(ts) AS last_ts "
+            f"FROM turns {where} GROUP BY {columns} ORDER BY {_ORDER_BY.get(order_by, 'cost')} DESC"
+        )
+        if limit is not None:
+            query += " LIMIT ?"
+            params.append(limit)
+        with self._connect() as connection:
+            return [dict(row) for row in connection.execute(query, params).fetchall()]
+
+    @staticmethod
+    def _where(actor_id: Optional[str], since: Optional[float]) -> Tuple[str, List[Any]]:
+        clauses, params = [], []
+        if actor_id:
+            clauses.append("actor_id = ?")
+            params.append(actor_id)
+        if since:
+            clauses.append("ts >= ?")
+            params.append(since)
+        return ("WHERE " + " AND ".join(clauses)) if clauses else "", params
+
+    def _connect(self) -> sqlite3.Connection:
+        connection = sqlite3.connect(self.db_path, timeout=10)
+        connection.row_factory = sqlite3.Row
+        connection.executescript(_SCHEMA)
+        # Databases created before turns were tagged with their model
+        if 'model_id' not in {row['name'] for row in connection.execute("PRAGMA table_info(turns)")}:
+            connection.execute("ALTER TABLE turns ADD COLUMN model_id TEXT")
+        return connection
+
+
+class UsageMeter:
+    """Thread-safe per-turn usage collector
+
+    ``record`` only updates in-memory totals and queues the turn; a daemon
+    thread writes queued turns to the ``UsageStore`` every ``flush_interval``
+    seconds, or sooner once ``max_pending`` turns are waiting, and on exit.
+    Without a ``db_path`` the totals are kept in memory only. Session totals
+    are capped at ``max_sessions`` (least recently active dropped first).
+    """
+
+    def __init__(
+        self,
+        db_path: Optional[str] = DEFAULT_DB_PATH,
+        flush_interval: float = 30,
+        max_pending: int = 500,
+        max_sessions: int = 10000
+    ):
+        self.store = UsageStore(db_path) if db_path else None
+        self.flush_interval = flush_interval
+        self.max_pending = max_pending
+        self.max_sessions = max_sessions
+        self._actors: Dict[str, Dict[str, float]] = {}
+        self._sessions: "OrderedDict[Tuple[str, str], Dict[str, float]]" = OrderedDict()
+        self._pending: List[Dict[str, Any]] = []
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._wake = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self.flushed = 0
+        self.flush_errors = 0
+
+        if self.store:
+            atexit.register(self.flush)
+
+    def record(
+        self,
+        actor_id: str,
+        session_id: str,
+        prompt: str,
+        usage: Dict[str, int],
+        cycles: int = 0,
+        tools: Optional[Dict[str, int]] = None,
+        latency_ms: int = 0,
+        model_id: Optional[str] = None
+    ) -> Dict[str, Any]:
+        """Meter one turn and return its record"""
+        tools = tools or {}
+        record = {
+            'ts': time.time(),
+            'actor_id': actor_id,
+            'session_id': session_id,
+            'prompt': prompt[:PROMPT_PREVIEW_CHARS],
+            'input_tokens': usage.get('inputTokens', 0),
+            'output_tokens': usage.get('outputTokens', 0),
+            'cache_read_tokens': usage.get('cacheReadInputTokens', 0),
+            'cache_write_tokens': usage.get('cacheWriteInputTokens', 0),
+            'cycles': cycles,
+            'tool_calls': sum(tools.values()),
+            'tools': tools,
+            'latency_ms': latency_ms,
+            'model_id': model_id
+        }
+        record['cost'] = estimate_cost(
+            record['input_tokens'], record['output_tokens'],
+            record['cache_read_tokens'], record['cache_write_tokens'],
+            model_id=model_id
+        )
+
+        with self._lock:
+            self._add(self._actors.setdefault(actor_id, {}), record)
+            session_key = (actor_id, session_id)
+            self._add(self._sessions.setdefault(session_key, {}), record)
+            self._sessions.move_to_end(session_key)
+            while len(self._sessions) > self.max_sessions:
+                self._sessions.popitem(last=False)
+            if self.store:
+                self._pending.append(record)
+                if len(self._pending) >= self.max_pending:
+                    self._wake.set()
+        if self.store:
+            self._ensure_flusher()
+        return record
+
+    def actor_totals(self) -> Dict[str, Dict[str, float]]:
+        """In-memory totals per actor since the process started"""
+        with self._lock:
+            return {actor_id: dict(totals) for actor_id, totals in self._actors.items()}
+
+    def session_totals(self, actor_id: Optional[str] = None) -> Dict[str, Dict[str, float]]:
+        """In-memory totals per session, optionally for one actor"""
+        with self._lock:
+            return {
+                session_id: dict(totals)
+                for (actor, session_id), totals in self._sessions.items()
+                if actor_id is None or actor == actor_id
+            }
+
+    def query(self, request: Dict[str, Any]) -> Dict[str, Any]:
+        """Answer a usage query (the runtime's ``usage`` payload) with per-actor, top session and top turn rankings
+
+        ``request`` may set ``actor_id``, ``since`` (epoch seconds), ``order_by``
+        (cost, tokens, latency, turns) and ``limit``. Queued turns are written
+        first so the answer includes the latest ones. Without a store only the
+        in-memory totals since the process started are returned.
+        """
+        actor_id = request.get('actor_id')
+        since = request.get('since')
+        order_by = request.get('order_by', 'cost')
+        limit = int(request.get('limit', 10))
+        if not self.store:
+            def rank(rows: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+                if order_by == 'tokens':
+                    return sorted(rows, key=lambda row: row['input_tokens'] + row['output_tokens'], reverse=True)
+                key = {'latency': 'latency_ms'}.get(order_by, order_by if order_by in COUNTERS else 'cost')
+                return sorted(rows, key=lambda row: row[key], reverse=True)
+
+            with self._lock:
+                actors = [{'actor_id': actor, **totals} for actor, totals in self._actors.items()]
+                sessions = [
+                    {'actor_id': actor, 'session_id': session_id, **totals}
+                    for (actor, session_id), totals in self._sessions.items()
+                    if actor_id is None or actor == actor_id
+                ]
+            return {'source': 'memory', 'actors': rank(actors), 'sessions': rank(sessions)[:limit], 'turns': []}
+        self.flush()
+        return {
+            'source': 'sqlite',
+            'actors': self.store.actor_totals(since=since, order_by=order_by),
+            'sessions': self.store.top_sessions(actor_id=actor_id, since=since, order_by=order_by, limit=limit),
+            'turns': self.store.top_turns(actor_id=actor_id, since=since, order_by=order_by, limit=limit)
+        }
+
+    def flush(self) -> int:
+        """Write queued turns to the store and return how many were written"""
+        if not self.store:
+            return 0
+        with self._flush_lock:
+            with self._lock:
+                records, self._pending = self._pending, []
+            if not records:
+                return 0
+            try:
+                self.store.write(records)
+            except Exception as e:
+                # Keep the turns for the next attempt, bounded so a broken sink cannot grow memory
+                with self._lock:
+                    self._pending = (records + self._pending)[-self.max_pending * 10:]
+                self.flush_errors += 1
+                print(f"Error flushing usage records: {str(e)}")
+                return 0
+            self.flushed += len(records)
+            return len(records)
+
+    def stats(self) -> Dict[str, Any]:
+        """Get sink state and counters"""
+        with self._lock:
+            return {
+                'db_path': self.store.db_path if self.store else None,
+                'actors': len(self._actors),
+                'sessions': len(self._sessions),
+                'pending': len(self._pending),
+                'flushed': self.flushed,
+                'flush_errors': self.flush_errors
+            }
+
+    @staticmethod
+    def _add(totals: Dict[str, float], record: Dict[str, Any]) -> None:
+        totals['turns'] = totals.get('turns', 0) + 1
+        for counter in COUNTERS[1:]:
+            totals[counter] = totals.get(counter, 0) + record[counter]
+
+    def _ensure_flusher(self) -> None:
+        if self._thread is None:
+            with self._lock:
+                if self._thread is None:
+                    self._thread = threading.Thread(target=self._run_flusher, name='usage-meter', daemon=True)
+                    self._thread.start()
+
+    def _run_flusher(self) -> None:
+        while True:
+            self._wake.wait(self.flush_interval)
+            self._wake.clear()
+            self.flush()
@@ -0,0 +1,85 @@
+"""
+Per-turn model routing between a fast and a strong Bedrock model
+Classifies each incoming message with cheap text heuristics: greetings,
+acknowledgements and short follow-ups go to the fast model, anything long,
+multi-part or likely to need tools or reasoning goes to the strong one
+"""
+import re
+import threading
+from collections import deque
+from typing import Any, Deque, Dict, Tuple
+
+FAST = 'fast'
+STRONG = 'strong'
+
+_WORD = re.compile(r"[a-z0-9']+")
+
+_SMALL_TALK = re.compile(
+    r"^(hi|hello|hey|yo|good (morning|afternoon|evening)|thanks?( you)?( so much)?|thank you|thx|ty|ok(ay)?|"
+    r"cool|great|nice|perfect|got it|sounds good|sure|yes|no|yep|nope|bye|goodbye|see you|cheers)\b[\s!.,?]*$"
+)
+
+# Words that signal tool use (knowledge base / web search) or multi-step reasoning
+_COMPLEX_TERMS = {
+    'agentic', 'memory', 'memories', 'search', 'find', 'look', 'latest', 'news', 'current', 'today', 'recent',
+    'research', 'compare', 'comparison', 'explain', 'analyze', 'analyse', 'why', 'how', 'design', 'plan',
+    'summarize', 'summarise', 'summary', 'code', 'write', 'debug', 'implement', 'calculate', 'step', 'steps',
+    'difference', 'pros', 'cons', 'tradeoffs', 'architecture', 'evaluate', 'document', 'documentation'
+}
+
+# Recent decisions kept per route for latency percentiles
+_LATENCY_WINDOW = 500
+
+
+class TurnRouter:
+    """Pick the fast or strong model for a message and keep per-route latency stats
+
+    A message goes to the fast model when it is small talk, or when it has at
+    most ``max_fast_words`` words, a single sentence and none of the terms
+    that usually lead to tool calls or longer reasoning. Everything else goes
+    to the strong model. ``route`` returns the route and the reason;
+    ``record`` adds a turn's latency to its route.
+    """
+
+    def __init__(self, max_fast_words: int = 12, max_fast_chars: int = 120):
+        self.max_fast_words = max_fast_words
+        self.max_fast_chars = max_fast_chars
+        self._lock = threading.Lock()
+        self._latencies: Dict[str, Deque[int]] = {FAST: deque(maxlen=_LATENCY_WINDOW), STRONG: deque(maxlen=_LATENCY_WINDOW)}
+        self._counts: Dict[str, int] = {FAST: 0, STRONG: 0}
+
+    def route(self, message: str) -> Tuple[str, str]:
+        """Return (route, reason) for a message"""
+        text = message.strip().lower()
+        if _SMALL_TALK.match(text):
+            return FAST, 'small_talk'
+        if len(text) > self.max_fast_chars or '```' in text:
+            return STRONG, 'long'
+        words = _WORD.findall(text)
+        if len(words) > self.max_fast_words:
+            return STRONG, 'long'
+        if len(re.findall(r"[.?!](\s|$)", text)) > 1:
+            return STRONG, 'multi_part'
+        if _COMPLEX_TERMS & set(words):
+            return STRONG, 'tools_or_reasoning'
+        return FAST, 'short'
+
+    def record(self, route: str, latency_ms: int) -> None:
+        with self._lock:
+            self._counts[route] += 1
+            self._latencies[route].append(latency_ms)
+
+    def stats(self) -> Dict[str, Any]:
+        """Turn counts and latency percentiles (ms) per route"""
+        with self._lock:
+            stats = {}
+            for route, latencies in self._latencies.items():
+                ordered = sorted(latencies)
+                stats[route] = {
+                    'turns': self._counts[route],
+                    'p50_ms': ordered[len(ordered) // 2] if ordered else 0,
+                    'p95_ms': ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))] if ordered else 0
+                }
+            total = sum(self._counts.values())
+            stats['fast_share'] = self._counts[FAST] / total if total else 0.0
+            return stats
@@ -3,7 +3,12 @@ Copilot - Sessions Management Page
 """
 import streamlit as st
 import uuid
-import boto3
+import json
+import threading
+from clients import get_client
+from session_events import EVENTS_MAX_RESULTS
+from transcript_cache import get_transcript_cache
+from session_previews import iter_previews
 from datetime import datetime
 
 st.set_page_config(
@@ -13,13 +18,50 @@ st.set_page_config(
 )
 
 # Constants
+CARD_PREVIEW_MESSAGES = 10
+VISIBLE_SESSIONS = 10
+PREVIEW_CHARS = 80
+AGENT_RUNTIME_ARN = 'arn:aws:bedrock-agentcore:us-east-1:924155096146:runtime/adp_copilot_agent-ey3rBD8Vnm'
 MEMORY_ID = ''
 REGION = 'us-east-1'
 
+def prefetch_session(actor_id: str, session_id: str, runtime_session_id: str):
+    """Ask the runtime to build and restore the session's agent before the first message"""
+    try:
+        client = get_client('bedrock-agentcore', REGION)
+        payload_dict = {
+            "prefetch": True,
+            "actor_id": actor_id,
+            "session_id": session_id
+        }
+        response = client.invoke_agent_runtime(
+            agentRuntimeArn=AGENT_RUNTIME_ARN,
+            runtimeSessionId=runtime_session_id,
+            payload=json.dumps(payload_dict).encode('utf-8'),
+            qualifier="DEFAULT"
+        )
+        # Drain the body so the pooled connection is reused
+        response['response'].read()
+    except Exception as e:
+        print(f"Error prefetching session {session_id}: {str(e)}")
+
+def load_session(session_id: str):
+    """Switch the chat page to a session, warming its agent in the background"""
+    st.session_state.session_id = session_id
+    st.session_state.runtime_session_id = f"streamlit_session_{uuid.uuid4().hex}"
+    st.session_state.messages = []
+    # Same runtime session id as the chat page, so the warm agent is on the same runtime instance
+    threading.Thread(
+        target=prefetch_session,
+        args=(st.session_state.actor_id, session_id, st.session_state.runtime_session_id),
+        daemon=True
+    ).start()
+    st.switch_page("streamlit_clean_app.py")
+
 def get_previous_sessions(actor_id: str):
     """Get list of previous session IDs for an actor"""
     try:
-        client = boto3.client('bedrock-agentcore', region_name=REGION)
+        client = get_client('bedrock-agentcore', REGION)
         sessions = client.list_sessions(
             memoryId=MEMORY_ID,
             actorId=actor_id
@@ -39,30 +81,56 @@ def get_previous_sessions(actor_id: str):
         st.error(f"Error getting sessions: {str(e)}")
         return []
 
-def get_messages_for_session(actor_id: str, session_id: str):
-    """Get messages for a specific session"""
+def iter_messages_for_session(actor_id: str, session_id: str, limit=EVENTS_MAX_RESULTS):
+    """Yield pages of decoded message records (newest first), reading only events not seen before"""
+    yield from get_transcript_cache(MEMORY_ID, REGION).iter_pages(actor_id, session_id, limit)
+
+def get_messages_for_session(actor_id: str, session_id: str, limit=None):
+    """Get decoded message records for a specific session"""
     try:
-        client = boto3.client('bedrock-agentcore', region_name=REGION)
-        events = client.list_events(
-            memoryId=MEMORY_ID,
-            actorId=actor_id,
-            sessionId=session_id
-        )
-        
-        messages = []
-        for event in events.get('events', []):
-            payload = event.get('payload', {})
-            if payload:
-                messages.append(payload)
-        
-        return messages
+        return get_transcript_cache(MEMORY_ID, REGION).get(actor_id, session_id, limit)
         
     except Exception as e:
         st.error(f"Error getting messages: {str(e)}")
         return []
 
+def display_message_record(record, max_chars=None):
+    """Show one decoded message"""
+    text = record['text'] if max_chars is None else f"{record['text'][:max_chars]}..."
+    if record['role'] == 'user':
+        st.markdown(f"👤 **User:** {text}")
+    elif record['role'] == 'assistant':
+        st.markdown(f"🤖 **Assistant:** {text}")
+
+def _format_time(value):
+    if isinstance(value, datetime):
+        return value.strftime("%Y-%m-%d %H:%M")
+    return str(value)
+
+def _preview_text(record):
+    if record is None:
+        return "-"
+    text = record['text'].replace("\n", " ")
+    return text if len(text) <= PREVIEW_CHARS else f"{text[:PREVIEW_CHARS]}..."
+
+def display_session_preview(placeholder, session_data, preview, error=None):
+    """Fill a session row's preview line"""
+    if preview is None:
+        placeholder.caption(f"Updated {_format_time(session_data['updated'])} · preview unavailable ({error})")
+        return
+    if not preview['count']:
+        placeholder.caption(f"Updated {_format_time(session_data['updated'])} · no messages")
+        return
+    count = f"{preview['count']}" if preview['complete'] else f"{preview['count']}+"
+    updated = preview['updated'] or session_data['updated']
+    placeholder.caption(
+        f"{count} messages · updated {_format_time(updated)}  \n"
+        + (f"First: {_preview_text(preview['first'])}  \n" if preview['first'] else "")
+        + f"Last: {_preview_text(preview['last'])}"
+    )
+
 def display_session_card(session_data, index):
-    """Display a session in a single clean line"""
+    """Display a session in a single clean line, returning the placeholder for its preview"""
     session_id = session_data['id']
     short_id = session_id[:8]
     
@@ -77,10 +145,7 @@ def display_session_card(session_data, index):
     
     with col3:
         if st.button("📥", key=f"load_{index}", help="Continue conversation"):
-            st.session_state.session_id = session_id
-            st.session_state.runtime_session_id = f"streamlit_session_{uuid.uuid4().hex}"
-            st.session_state.messages = []
-            st.switch_page("streamlit_clean_app.py")
+            load_session(session_id)
     
     with col4:
         if st.button("👁️", key=f"view_{index}", help="View messages"):
@@ -91,53 +156,29 @@ def display_session_card(session_data, index):
                 st.session_state.viewing_session = session_id
             st.rerun()
     
+    # Filled in by main() as the session's preview arrives
+    preview_placeholder = st.empty()
+    preview_placeholder.caption("Loading preview...")
+    
     # Expandable message view (only if this session is being viewed)
     if st.session_state.get('viewing_session') == session_id:
         with st.container():
             st.markdown("**Messages:**")
-            messages = get_messages_for_session(st.session_state.actor_id, session_id)
+            # One extra message tells whether there are more than the preview shows
+            messages = get_messages_for_session(
+                st.session_state.actor_id, session_id, limit=CARD_PREVIEW_MESSAGES + 1
+            )
             if messages:
-                for i, msg in enumerate(messages[:10]):
-                    try:
-                        # msg is a list, get the first item
-                        import json
-                        msg_item = msg[0] if isinstance(msg, list) else msg
-                        content = msg_item['conversational']['content']['text']
-                        parsed = json.loads(content)
-                        message_data = parsed['message']
-                        role = message_data['role']
-                        content_list = message_data['content']
-                        
-                        # Extract readable content based on type
-                        display_text = ""
-                        for content_item in content_list:
-                            if 'text' in content_item:
-                                display_text = content_item['text']
-                                break
-                            elif 'toolUse' in content_item:
-                                tool_name = content_item['toolUse'].get('name', 'unknown_tool')
-                                display_text = f"[Used tool: {tool_name}]"
-                                break
-                            elif 'toolResult' in content_item:
-                                display_text = "[Tool result]"
-                                break
-                        
-                        # Display with clean formatting
-                        if role == 'user':
-                            st.markdown(f"👤 **User:** {display_text[:200]}...")
-                        elif role == 'assistant':
-                            st.markdown(f"🤖 **Assistant:** {display_text[:200]}...")
-                        
-                    except Exception as e:
-                        # If parsing fails, show raw but cleaner
-                        st.text(f"{i+1}. [Parse error: {str(e)}]")
-                        st.text(f"Raw: {str(msg)[:100]}...")
+                for record in messages[:CARD_PREVIEW_MESSAGES]:
+                    display_message_record(record, max_chars=200)
                 
-                if len(messages) > 10:
-                    st.caption(f"... and {len(messages) - 10} more messages")
+                if len(messages) > CARD_PREVIEW_MESSAGES:
+                    st.caption("... more messages, open the session to see all")
             else:
                 st.caption("No messages found")
             st.markdown("---")
+    
+    return preview_placeholder
 
 def display_session_messages(session_id):
     """Display messages for a specific session"""
@@ -152,24 +193,28 @@ def display_session_messages(session_id):
     
     with col2:
         if st.button("📥 Load This Session"):
-            st.session_state.session_id = session_id
-            st.session_state.runtime_session_id = f"streamlit_session_{uuid.uuid4().hex}"
-            st.session_state.messages = []
             if 'viewing_session' in st.session_state:
                 del st.session_state.viewing_session
-            st.switch_page("streamlit_clean_app.py")
+            load_session(session_id)
     
     st.divider()
     
-    messages = get_messages_for_session(st.session_state.actor_id, session_id)
-    if messages:
-        st.success(f"Found {len(messages)} messages")
-        
-        for i, msg in enumerate(messages):
-            with st.expander(f"Message {i+1}", expanded=False):
-                st.json(msg)
-    else:
-        st.warning("No messages found for this session")
+    # Render each page of messages as it arrives (newest first)
+    try:
+        status = st.empty()
+        count = 0
+        for page in iter_messages_for_session(st.session_state.actor_id, session_id):
+            for record in page:
+                count += 1
+                with st.expander(f"Message {count} ({record['role']})", expanded=False):
+                    display_message_record(record)
+            status.info(f"Loading... {count} messages so far")
+        if count:
+            status.success(f"Found {count} messages")
+        else:
+            status.warning("No messages found for this session")
+    except Exception as e:
+        st.error(f"Error getting messages: {str(e)}")
 
 def main():
     """Sessions management page"""
@@ -208,8 +253,15 @@ def main():
     sessions = get_previous_sessions(st.session_state.actor_id)
     
     if sessions:
-        for i, session in enumerate(sessions[:10]):
-            display_session_card(session, i)
+        visible = sessions[:VISIBLE_SESSIONS]
+        # Read every visible session's preview at once, then fill rows as each one arrives
+        previews = iter_previews(MEMORY_ID, REGION, st.session_state.actor_id, [session['id'] for session in visible])
+        placeholders = {}
+        for i, session in enumerate(visible):
+            placeholders[session['id']] = (display_session_card(session, i), session)
+        for session_id, preview, error in previews:
+            placeholder, session = placeholders[session_id]
+            display_session_preview(placeholder, session, preview, error)
     else:
         st.markdown("No conversations yet")
         
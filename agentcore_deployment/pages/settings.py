@@ -2,8 +2,10 @@
 Copilot - Settings & Configuration Page
 """
 import streamlit as st
-import boto3
+from clients import get_client
 import json
+import time
+import uuid
 
 st.set_page_config(
     page_title="Settings - Copilot",
@@ -19,7 +21,7 @@ MEMORY_ID = ''
 def test_agentcore_connection():
     """Test connection to AgentCore Runtime"""
     try:
-        client = boto3.client('bedrock-agentcore', region_name=REGION)
+        client = get_client('bedrock-agentcore', REGION)
         
         payload_dict = {
             "prompt": "Hello, this is a connection test.",
@@ -45,7 +47,7 @@ def test_agentcore_connection():
 def test_memory_connection():
     """Test connection to AgentCore Memory"""
     try:
-        client = boto3.client('bedrock-agentcore', region_name=REGION)
+        client = get_client('bedrock-agentcore', REGION)
         
         # Try to list sessions to test memory access
         response = client.list_sessions(
@@ -183,6 +185,12 @@ def display_tools_info():
             "description": "Search the web for current information and general questions",
             "usage": "Automatically triggered for general questions, current events, etc."
         },
+        {
+            "name": "Hybrid Search",
+            "icon": "🔀",
+            "description": "Searches the knowledge base and the web in parallel and merges the results",
+            "usage": "Triggered for questions that need both Agentic AI Memory material and current information"
+        },
         {
             "name": "Persistent Memory",
             "icon": "🧠",
@@ -207,6 +215,69 @@ def display_tools_info():
             </div>
             """, unsafe_allow_html=True)
 
+def query_usage(query: dict):
+    """Ask the runtime for its metered usage (the usage database lives in the runtime container)"""
+    client = get_client('bedrock-agentcore', REGION)
+    # The chat's runtime session reaches the runtime instance that served this user's turns
+    if 'runtime_session_id' not in st.session_state:
+        st.session_state.runtime_session_id = f"streamlit_session_{uuid.uuid4().hex}"
+    response = client.invoke_agent_runtime(
+        agentRuntimeArn=AGENT_RUNTIME_ARN,
+        runtimeSessionId=st.session_state.runtime_session_id,
+        payload=json.dumps({"usage": query}).encode('utf-8'),
+        qualifier="DEFAULT"
+    )
+    # A single event, sent as one SSE "data:" line or a plain JSON body
+    for line in response['response'].read().decode('utf-8').splitlines():
+        line = line[len("data: "):] if line.startswith("data: ") else line
+        if not line.strip():
+            continue
+        event = json.loads(line)
+        if isinstance(event, dict) and 'usage' in event:
+            return event['usage']
+        if isinstance(event, str):
+            raise RuntimeError(event)
+    raise RuntimeError("No usage in the runtime response")
+
+def display_usage():
+    """Display metered token usage and cost per actor, session and prompt"""
+    st.subheader("💰 Usage & Cost")
+    
+    col1, col2, col3 = st.columns(3)
+    with col1:
+        period = st.selectbox("Period", ["Last 24 hours", "Last 7 days", "All time"])
+    with col2:
+        order_by = st.selectbox("Rank by", ["cost", "tokens", "latency", "turns"])
+    with col3:
+        only_me = st.checkbox("Only current actor", value=False)
+    
+    since = {"Last 24 hours": time.time() - 86400, "Last 7 days": time.time() - 7 * 86400}.get(period)
+    actor_id = st.session_state.get('actor_id') if only_me else None
+    
+    if not st.button("Load usage"):
+        return
+    
+    try:
+        with st.spinner("Querying the runtime..."):
+            usage = query_usage({"actor_id": actor_id, "since": since, "order_by": order_by})
+        
+        if usage.get('source') == 'memory':
+            st.caption("The runtime keeps usage in memory only (METERING_DB_PATH is empty): totals since it started, no per-prompt history.")
+        
+        st.markdown("**Per actor**")
+        st.dataframe(usage['actors'], use_container_width=True)
+        
+        st.markdown("**Top sessions**")
+        st.dataframe(usage['sessions'], use_container_width=True)
+        
+        st.markdown("**Top prompts**")
+        st.dataframe(
+            [{**turn, 'tools': json.dumps(turn['tools'])} for turn in usage['turns']],
+            use_container_width=True
+        )
+    except Exception as e:
+        st.error(f"Error loading usage: {str(e)}")
+
 def main():
     """Settings page"""
     # Header
@@ -248,6 +319,9 @@ def main():
     with st.expander("Advanced", expanded=False):
         display_runtime_config()
         display_tools_info()
+    
+    with st.expander("Usage & Cost", expanded=False):
+        display_usage()
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
@@ -0,0 +1,141 @@
+"""
+Semantic response cache for repeated questions
+Answers a message with an earlier answer when its embedding is close enough
+to a question asked before, skipping the model turn and its tools. Entries are
+scoped to the actor who asked, or shared by every actor when the answer came
+from the knowledge base alone. Entries are keyed on the question only, so
+callers must only look up and store answers that do not depend on the
+conversation around them, and only share answers without personalization
+"""
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Optional, Tuple
+
+import numpy as np
+
+from result_cache import normalize_query
+
+GLOBAL_SCOPE = '*'
+
+# Query embeddings kept so a miss followed by a put embeds the question once
+_EMBEDDING_MEMO_SIZE = 64
+
+
+class SemanticResponseCache:
+    """Thread-safe answer cache matched by cosine similarity of question embeddings
+
+    ``lookup`` returns the answer of the most similar unexpired question in
+    the actor's scope or the global scope if it reaches ``threshold``.
+    ``put`` stores an answer for ``ttl`` seconds; each scope keeps at most
+    ``max_entries`` questions (least recently used dropped first) and at most
+    ``max_scopes`` actor scopes are kept. ``invalidate`` drops an actor's
+    entries, the global ones or everything, e.g. after the knowledge base or
+    an actor's memory changes.
+    """
+
+    def __init__(
+        self,
+        embed: Callable[[str], np.ndarray],
+        threshold: float = 0.92,
+        ttl: float = 3600,
+        max_entries: int = 256,
+        max_scopes: int = 1024
+    ):
+        self.embed = embed
+        self.threshold = threshold
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.max_scopes = max_scopes
+        # scope -> normalized question -> (expires_at, vector, answer)
+        self._scopes: "OrderedDict[str, OrderedDict[str, Tuple[float, np.ndarray, str]]]" = OrderedDict()
+        self._embeddings: "OrderedDict[str, np.ndarray]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+
+    def lookup(self, actor_id: str, question: str) -> Optional[str]:
+        """Return a cached answer to a similar question, or None"""
+        vector = self._vector(question)
+        best_score, best = -1.0, None
+        with self._lock:
+            now = time.time()
+            for scope in (actor_id, GLOBAL_SCOPE):
+                entries = self._scopes.get(scope)
+                if not entries:
+                    continue
+                for key in [key for key, (expires_at, _, _) in entries.items() if expires_at <= now]:
+                    del entries[key]
+                if not entries:
+                    continue
+                keys = list(entries)
+                scores = np.stack([entries[key][1] for key in keys]) @ vector
+                top = int(np.argmax(scores))
+                if scores[top] > best_score:
+                    best_score, best = float(scores[top]), (scope, keys[top])
+
+            if best is None or best_score < self.threshold:
+                self.misses += 1
+                return None
+            scope, key = best
+            self._scopes[scope].move_to_end(key)
+            self.hits += 1
+            return self._scopes[scope][key][2]
+
+    def put(self, actor_id: str, question: str, answer: str, shared: bool = False) -> None:
+        """Cache an answer for the actor, or for every actor when ``shared``"""
+        vector = self._vector(question)
+        scope = GLOBAL_SCOPE if shared else actor_id
+        with self._lock:
+            entries = self._scopes.setdefault(scope, OrderedDict())
+            self._scopes.move_to_end(scope)
+            key = normalize_query(question)
+            entries[key] = (time.time() + self.ttl, vector, answer)
+            entries.move_to_end(key)
+            while len(entries) > self.max_entries:
+                entries.popitem(last=False)
+            while len(self._scopes) > self.max_scopes:
+                oldest = next(iter(self._scopes))
+                if oldest == GLOBAL_SCOPE:
+                    self._scopes.move_to_end(oldest)
+                    oldest = next(iter(self._scopes))
+                del self._scopes[oldest]
+
+    def invalidate(self, actor_id: Optional[str] = None, shared: bool = False) -> None:
+        """Drop an actor's entries, the shared entries, or (no arguments) everything"""
+        with self._lock:
+            if actor_id is None and not shared:
+                self._scopes.clear()
+            else:
+                if actor_id is not None:
+                    self._scopes.pop(actor_id, None)
+                if shared:
+                    self._scopes.pop(GLOBAL_SCOPE, None)
+            self.invalidations += 1
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'scopes': len(self._scopes),
+                'entries': sum(len(entries) for entries in self._scopes.values()),
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_rate': self.hits / lookups if lookups else 0.0,
+                'invalidations': self.invalidations
+            }
+
+    def _vector(self, question: str) -> np.ndarray:
+        key = normalize_query(question)
+        with self._lock:
+            vector = self._embeddings.get(key)
+            if vector is not None:
+                self._embeddings.move_to_end(key)
+                return vector
+        vector = self.embed(question)
+        with self._lock:
+            self._embeddings[key] = vector
+            while len(self._embeddings) > _EMBEDDING_MEMO_SIZE:
+                self._embeddings.popitem(last=False)
+        return vector
@@ -0,0 +1,195 @@
+"""
+TTL + LRU result cache for tool lookups
+Coalesces concurrent identical lookups into one upstream call, with optional
+JSON persistence so cached results survive container restarts
+"""
+import atexit
+import json
+import os
+import re
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import Future
+from typing import Any, Callable, Dict, Hashable, Optional, Tuple
+
+_MISSING = object()
+
+
+def normalize_query(query: str) -> str:
+    """Normalize query text so trivially different phrasings share a cache key"""
+    query = re.sub(r"\s+", " ", query.strip().lower())
+    return query.rstrip(" ?!.")
+
+
+class ResultCache:
+    """Thread-safe cache with a fixed time-to-live and LRU eviction
+
+    Keys are tuples of JSON-serializable values. ``get_or_load`` runs at most
+    one loader per key at a time; concurrent callers for the same key wait for
+    that result instead of issuing their own upstream call. When
+    ``persist_path`` is set the cache is loaded from that file on creation and
+    written back at most every ``persist_interval`` seconds and on exit.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        max_entries: int = 512,
+        ttl: float = 3600,
+        persist_path: Optional[str] = None,
+        persist_interval: float = 60
+    ):
+        self.name = name
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.persist_path = persist_path
+        self.persist_interval = persist_interval
+        self._entries: "OrderedDict[Hashable, Tuple[float, Any]]" = OrderedDict()
+        self._inflight: Dict[Hashable, Future] = {}
+        self._lock = threading.Lock()
+        self._dirty = False
+        self._last_persist = time.time()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.coalesced = 0
+
+        if self.persist_path:
+            self._load()
+            atexit.register(self.save)
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._entries)
+
+    def get(self, key: Tuple, default: Any = None) -> Any:
+        """Return a fresh cached value, or default on a miss"""
+        with self._lock:
+            value = self._get_locked(key)
+            if value is _MISSING:
+                self.misses += 1
+                return default
+            self.hits += 1
+            return value
+
+    def put(self, key: Tuple, value: Any) -> None:
+        """Cache a value, evicting the least recently used entries past the limit"""
+        with self._lock:
+            self._entries[key] = (time.time() + self.ttl, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+            self._dirty = True
+            should_persist = self.persist_path and time.time() - self._last_persist >= self.persist_interval
+        if should_persist:
+            self.save()
+
+    def get_or_load(self, key: Tuple, loader: Callable[[], Any]) -> Any:
+        """Return a cached value, calling loader once on a miss even under concurrency"""
+        with self._lock:
+            value = self._get_locked(key)
+            if value is not _MISSING:
+                self.hits += 1
+                return value
+            future = self._inflight.get(key)
+            owner = future is None
+            if owner:
+                self.misses += 1
+                future = Future()
+                self._inflight[key] = future
+            else:
+                self.coalesced += 1
+
+        if not owner:
+            return future.result()
+
+        try:
+            value = loader()
+        except BaseException as e:
+            with self._lock:
+                self._inflight.pop(key, None)
+            future.set_exception(e)
+            raise
+
+        # Cache before releasing waiters so later callers hit instead of reloading
+        self.put(key, value)
+        with self._lock:
+            self._inflight.pop(key, None)
+        future.set_result(value)
+        return value
+
+    def invalidate(self, key: Optional[Tuple] = None) -> None:
+        """Drop one entry, or every entry when no key is given"""
+        with self._lock:
+            if key is None:
+                self._entries.clear()
+            else:
+                self._entries.pop(key, None)
+            self._dirty = True
+
+    def stats(self) -> Dict[str, Any]:
+        """Get hit/miss counters and current occupancy"""
+        with self._lock:
+            lookups = self.hits + self.misses + self.coalesced
+            return {
+                'name': self.name,
+                'entries': len(self._entries),
+                'max_entries': self.max_entries,
+                'ttl': self.ttl,
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_rate': self.hits / lookups if lookups else 0.0,
+                'coalesced': self.coalesced,
+                'upstream_calls': self.misses,
+                'upstream_calls_saved': self.hits + self.coalesced,
+                'evictions': self.evictions
+            }
+
+    def save(self) -> None:
+        """Write unexpired entries to the persistence file"""
+        if not self.persist_path:
+            return
+        with self._lock:
+            if not self._dirty:
+                return
+            now = time.time()
+            records = [
+                [list(key), expires_at, value]
+                for key, (expires_at, value) in self._entries.items()
+                if expires_at > now
+            ]
+            self._dirty = False
+            self._last_persist = now
+        try:
+            tmp_path = f"{self.persist_path}.tmp"
+            with open(tmp_path, 'w') as f:
+                json.dump(records, f, default=str)
+            os.replace(tmp_path, self.persist_path)
+        except Exception as e:
+            print(f"Error saving {self.name} cache: {str(e)}")
+
+    def _get_locked(self, key: Tuple) -> Any:
+        entry = self._entries.get(key)
+        if entry is None:
+            return _MISSING
+        expires_at, value = entry
+        if expires_at <= time.time():
+            del self._entries[key]
+            return _MISSING
+        self._entries.move_to_end(key)
+        return value
+
+    def _load(self) -> None:
+        if not os.path.exists(self.persist_path):
+            return
+        try:
+            with open(self.persist_path) as f:
+                records = json.load(f)
+            now = time.time()
+            for key, expires_at, value in records[-self.max_entries:]:
+                if expires_at > now:
+                    self._entries[tuple(key)] = (expires_at, value)
+        except Exception as e:
+            print(f"Error loading {self.name} cache: {str(e)}")
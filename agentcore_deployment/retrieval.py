@@ -0,0 +1,145 @@
+"""
+Retrieval pipeline for knowledge base results
+Turns raw Bedrock knowledge base retrieval results into a small, dense set of
+passages: score threshold, near-duplicate removal, optional local rerank,
+top-k and a token budget, keeping each passage's score and source URI
+"""
+import re
+from typing import Dict, List, Set
+
+from conversation_budget import CHARS_PER_TOKEN
+
+_WORD = re.compile(r"[a-z0-9]+")
+
+# Ignored when matching query terms against passages during rerank
+_STOPWORDS = {
+    'a', 'an', 'and', 'are', 'as', 'at', 'be', 'by', 'can', 'do', 'does', 'for', 'from', 'how', 'in', 'is',
+    'it', 'of', 'on', 'or', 'that', 'the', 'this', 'to', 'what', 'when', 'where', 'which', 'who', 'why',
+    'with', 'you', 'your'
+}
+
+TRUNCATED = "..."
+
+
+def kb_source(result: Dict) -> str:
+    """Get the source URI of a knowledge base result"""
+    location = result.get('location', {})
+    for key in ('s3Location', 'webLocation', 'confluenceLocation', 'sharePointLocation', 'salesforceLocation'):
+        if key in location:
+            return location[key].get('uri') or location[key].get('url', '')
+    return ''
+
+
+def _words(text: str) -> List[str]:
+    return _WORD.findall(text.lower())
+
+
+def query_terms(text: str) -> Set[str]:
+    """Content words of a query (lowercased, stopwords removed)"""
+    return {word for word in _words(text) if word not in _STOPWORDS}
+
+
+def _shingles(words: List[str], size: int = 3) -> Set[str]:
+    if len(words) < size:
+        return {' '.join(words)} if words else set()
+    return {' '.join(words[i:i + size]) for i in range(len(words) - size + 1)}
+
+
+def similarity(a: Set[str], b: Set[str]) -> float:
+    """Jaccard similarity of two shingle sets"""
+    if not a or not b:
+        return 0.0
+    return len(a & b) / len(a | b)
+
+
+class RetrievalPipeline:
+    """Post-processing stage between knowledge base retrieval and the model
+
+    Passages below ``min_score`` are dropped, then any passage whose word
+    3-shingles overlap a better-scored passage by ``dedup_threshold`` or more
+    (Jaccard) is removed. With ``rerank`` the remaining passages are reordered
+    by a blend of retrieval score and query-term coverage
+    (``rerank_weight`` is the weight of the latter). The best ``top_k`` are
+    kept and cut to ``max_tokens`` in total.
+    """
+
+    def __init__(
+        self,
+        top_k: int = 3,
+        min_score: float = 0.0,
+        dedup_threshold: float = 0.8,
+        rerank: bool = False,
+        rerank_weight: float = 0.5,
+        max_tokens: int = 1200
+    ):
+        self.top_k = top_k
+        self.min_score = min_score
+        self.dedup_threshold = dedup_threshold
+        self.rerank = rerank
+        self.rerank_weight = rerank_weight
+        self.max_tokens = max_tokens
+
+    def select(self, query: str, results: List[Dict]) -> List[Dict]:
+        """Pick the passages worth sending to the model, best first"""
+        passages = [
+            {
+                'text': result.get('content', {}).get('text', '').strip(),
+                'score': float(result.get('score') or 0.0),
+                'source': kb_source(result)
+            }
+            for result in results
+        ]
+        passages = [p for p in passages if p['text'] and p['score'] >= self.min_score]
+        passages.sort(key=lambda p: p['score'], reverse=True)
+        passages = self._dedup(passages)
+        if self.rerank:
+            passages = self._rerank(query, passages)
+        return self._budget(passages[:self.top_k])
+
+    @staticmethod
+    def format(passages: List[Dict]) -> str:
+        """Render passages with their rank, score and source"""
+        blocks = []
+        for rank, passage in enumerate(passages, start=1):
+            header = f"[{rank}] score={passage['score']:.2f}"
+            if passage['source']:
+                header += f" source={passage['source']}"
+            blocks.append(f"{header}\n{passage['text']}")
+        return "\n\n".join(blocks)
+
+    def _dedup(self, passages: List[Dict]) -> List[Dict]:
+        kept: List[Dict] = []
+        kept_shingles: List[Set[str]] = []
+        for passage in passages:
+            shingles = _shingles(_words(passage['text']))
+            if any(similarity(shingles, other) >= self.dedup_threshold for other in kept_shingles):
+                continue
+            kept.append(passage)
+            kept_shingles.append(shingles)
+        return kept
+
+    def _rerank(self, query: str, passages: List[Dict]) -> List[Dict]:
+        terms = query_terms(query)
+        if not terms or not passages:
+            return passages
+        top_score = max(p['score'] for p in passages) or 1.0
+
+        def blended(passage: Dict) -> float:
+            coverage = len(terms & set(_words(passage['text']))) / len(terms)
+            return (1 - self.rerank_weight) * passage['score'] / top_score + self.rerank_weight * coverage
+
+        return sorted(passages, key=blended, reverse=True)
+
+    def _budget(self, passages: List[Dict]) -> List[Dict]:
+        remaining = self.max_tokens * CHARS_PER_TOKEN
+        budgeted = []
+        for passage in passages:
+            if remaining <= len(TRUNCATED):
+                break
+            text = passage['text']
+            if len(text) > remaining:
+                text = text[:remaining - len(TRUNCATED)].rstrip() + TRUNCATED
+            budgeted.append({**passage, 'text': text})
+            remaining -= len(text)
+        return budgeted
+
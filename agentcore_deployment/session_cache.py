@@ -0,0 +1,212 @@
+"""
+Bounded agent cache for AgentCore Runtime
+LRU ordering with idle TTL, entry-count and estimated-byte ceilings
+"""
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+
+class _CacheEntry:
+    """Cached value plus bookkeeping used for eviction"""
+
+    __slots__ = ('value', 'size', 'last_access')
+
+    def __init__(self, value: Any, size: int):
+        self.value = value
+        self.size = size
+        self.last_access = time.monotonic()
+
+
+class AgentCache:
+    """Thread-safe LRU cache that evicts idle or excess agents
+
+    Entries are evicted when they have been idle longer than ``idle_ttl``
+    seconds, or when the cache grows past ``max_entries`` entries or
+    ``max_bytes`` estimated bytes. Evicted values are passed to ``on_evict``
+    (outside the cache lock) so they can flush state before being dropped.
+    Keys for which ``in_use`` returns True (e.g. sessions mid-turn) are never
+    evicted; they are reconsidered on the next put or touch. Eviction hooks
+    may block, so call this cache from worker threads, not an event loop.
+    """
+
+    def __init__(
+        self,
+        max_entries: int = 256,
+        max_bytes: Optional[int] = None,
+        idle_ttl: Optional[float] = 1800,
+        sizeof: Optional[Callable[[Any], int]] = None,
+        on_evict: Optional[Callable[[str, Any], None]] = None,
+        in_use: Optional[Callable[[str], bool]] = None
+    ):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.idle_ttl = idle_ttl
+        self._sizeof = sizeof or (lambda value: 0)
+        self._on_evict = on_evict
+        self._in_use = in_use or (lambda key: False)
+        self._entries: "OrderedDict[str, _CacheEntry]" = OrderedDict()
+        self._lock = threading.RLock()
+        self._total_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._entries)
+
+    def __contains__(self, key: str) -> bool:
+        with self._lock:
+            entry = self._entries.get(key)
+            return entry is not None and not self._is_expired(entry, time.monotonic())
+
+    def get(self, key: str) -> Optional[Any]:
+        """Return the cached value for key and mark it most recently used"""
+        with self._lock:
+            expired = self._expire_locked()
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                value = None
+            else:
+                self.hits += 1
+                entry.last_access = time.monotonic()
+                self._entries.move_to_end(key)
+                value = entry.value
+        self._dispose(expired)
+        return value
+
+    def put(self, key: str, value: Any) -> None:
+        """Insert or replace a value, evicting entries past the limits"""
+        entry = _CacheEntry(value, self._safe_sizeof(value))
+        with self._lock:
+            replaced = self._entries.pop(key, None)
+            if replaced is not None:
+                self._total_bytes -= replaced.size
+            self._entries[key] = entry
+            self._total_bytes += entry.size
+            evicted = self._expire_locked() + self._shrink_locked()
+        if replaced is not None and replaced.value is not value:
+            evicted.append((key, replaced.value))
+        self._dispose(evicted)
+
+    def get_or_create(self, key: str, factory: Callable[[], Any]) -> Any:
+        """Return the cached value for key, building it with factory on a miss"""
+        value = self.get(key)
+        if value is None:
+            value = factory()
+            self.put(key, value)
+        return value
+
+    def touch(self, key: str) -> None:
+        """Re-estimate the size of an entry after its value has grown"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return
+            size = self._safe_sizeof(entry.value)
+            self._total_bytes += size - entry.size
+            entry.size = size
+            entry.last_access = time.monotonic()
+            evicted = self._shrink_locked()
+        self._dispose(evicted)
+
+    def pop(self, key: str) -> Optional[Any]:
+        """Remove an entry and run the eviction hook for it"""
+        with self._lock:
+            entry = self._entries.pop(key, None)
+            if entry is None:
+                return None
+            self._total_bytes -= entry.size
+            self.evictions += 1
+        self._dispose([(key, entry.value)])
+        return entry.value
+
+    def expire(self) -> int:
+        """Evict every entry idle for longer than the TTL"""
+        with self._lock:
+            expired = self._expire_locked()
+        self._dispose(expired)
+        return len(expired)
+
+    def clear(self) -> None:
+        """Evict every entry, e.g. on shutdown"""
+        with self._lock:
+            evicted = [(key, entry.value) for key, entry in self._entries.items()]
+            self._entries.clear()
+            self._total_bytes = 0
+            self.evictions += len(evicted)
+        self._dispose(evicted)
+
+    def stats(self) -> Dict[str, Any]:
+        """Get cache counters and current occupancy"""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'entries': len(self._entries),
+                'bytes': self._total_bytes,
+                'max_entries': self.max_entries,
+                'max_bytes': self.max_bytes,
+                'idle_ttl': self.idle_ttl,
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_rate': self.hits / lookups if lookups else 0.0,
+                'evictions': self.evictions,
+                'expirations': self.expirations
+            }
+
+    def _is_expired(self, entry: _CacheEntry, now: float) -> bool:
+        return self.idle_ttl is not None and now - entry.last_access > self.idle_ttl
+
+    def _expire_locked(self) -> List[Tuple[str, Any]]:
+        # Entries are kept in access order, so idle ones sit at the front
+        expired = []
+        if self.idle_ttl is None:
+            return expired
+        now = time.monotonic()
+        for key, entry in list(self._entries.items()):
+            if not self._is_expired(entry, now):
+                break
+            if self._in_use(key):
+                continue
+            del self._entries[key]
+            self._total_bytes -= entry.size
+            self.expirations += 1
+            expired.append((key, entry.value))
+        return expired
+
+    def _over_limits_locked(self) -> bool:
+        return len(self._entries) > self.max_entries or (self.max_bytes is not None and self._total_bytes > self.max_bytes)
+
+    def _shrink_locked(self) -> List[Tuple[str, Any]]:
+        # Always keep the most recently used entry, even if it alone is over budget;
+        # entries in use stay over budget until a later put or touch
+        evicted = []
+        for key in list(self._entries)[:-1]:
+            if not self._over_limits_locked():
+                break
+            if self._in_use(key):
+                continue
+            entry = self._entries.pop(key)
+            self._total_bytes -= entry.size
+            self.evictions += 1
+            evicted.append((key, entry.value))
+        return evicted
+
+    def _safe_sizeof(self, value: Any) -> int:
+        try:
+            return int(self._sizeof(value))
+        except Exception:
+            return 0
+
+    def _dispose(self, evicted: List[Tuple[str, Any]]) -> None:
+        if not self._on_evict:
+            return
+        for key, value in evicted:
+            try:
+                self._on_evict(key, value)
+            except Exception as e:
+                print(f"Error evicting cached agent {key}: {str(e)}")
@@ -0,0 +1,95 @@
+"""
+Per-session request dispatcher for AgentCore Runtime
+Serializes work within a session while different sessions run in parallel
+"""
+import asyncio
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, Dict, Optional
+
+
+class SessionBusyError(Exception):
+    """Raised when a session already has too many requests queued"""
+
+
+class _SessionSlot:
+    """Lock and queue depth for one session"""
+
+    __slots__ = ('lock', 'pending')
+
+    def __init__(self):
+        self.lock = asyncio.Lock()
+        self.pending = 0
+
+
+class SessionDispatcher:
+    """Grants one request at a time per session key, with a bounded wait queue
+
+    Requests for the same key run strictly one after another, which also
+    guarantees the session's agent is constructed only once. Requests beyond
+    ``max_queued`` waiters (or waiting longer than ``queue_timeout`` seconds)
+    are rejected with SessionBusyError instead of piling up. Must be used from
+    a single event loop; there is no global lock across sessions.
+    """
+
+    def __init__(self, max_queued: int = 4, queue_timeout: Optional[float] = None):
+        self.max_queued = max_queued
+        self.queue_timeout = queue_timeout
+        self._slots: Dict[str, _SessionSlot] = {}
+        self.dispatched = 0
+        self.queued = 0
+        self.rejected = 0
+
+    @asynccontextmanager
+    async def session(self, key: str) -> AsyncIterator[None]:
+        """Hold exclusive access to a session for the duration of the block"""
+        slot = self._slots.get(key)
+        if slot is None:
+            slot = self._slots[key] = _SessionSlot()
+
+        # pending counts the running request plus everything waiting behind it
+        if slot.pending > self.max_queued:
+            self.rejected += 1
+            raise SessionBusyError(f"Session {key} has {slot.pending} requests in progress")
+
+        if slot.pending:
+            self.queued += 1
+        slot.pending += 1
+        try:
+            if self.queue_timeout is None:
+                await slot.lock.acquire()
+            else:
+                await asyncio.wait_for(slot.lock.acquire(), self.queue_timeout)
+        except asyncio.TimeoutError:
+            self.rejected += 1
+            self._release_slot(key, slot)
+            raise SessionBusyError(f"Timed out waiting for session {key}")
+        except BaseException:
+            self._release_slot(key, slot)
+            raise
+
+        self.dispatched += 1
+        try:
+            yield
+        finally:
+            slot.lock.release()
+            self._release_slot(key, slot)
+
+    def is_active(self, key: str) -> bool:
+        """Whether a request for the session is running or waiting (safe to call from other threads)"""
+        return key in self._slots
+
+    def stats(self) -> Dict[str, Any]:
+        """Get dispatcher counters and current load"""
+        return {
+            'active_sessions': len(self._slots),
+            'waiting': sum(max(0, slot.pending - 1) for slot in self._slots.values()),
+            'max_queued': self.max_queued,
+            'dispatched': self.dispatched,
+            'queued': self.queued,
+            'rejected': self.rejected
+        }
+
+    def _release_slot(self, key: str, slot: _SessionSlot) -> None:
+        slot.pending -= 1
+        if slot.pending == 0 and self._slots.get(key) is slot:
+            del self._slots[key]
@@ -0,0 +1,36 @@
+"""
+Paginated reader for AgentCore memory session events
+Reads one list_events page at a time so callers follow nextToken themselves
+and can render each page as it arrives instead of waiting for (or silently
+truncating) the whole transcript
+"""
+import os
+from typing import Dict, List, Optional, Tuple
+
+from clients import get_client
+
+# list_events page size (the API allows at most 100) and default cap on messages shown per session
+EVENTS_PAGE_SIZE = int(os.getenv('EVENTS_PAGE_SIZE', '50'))
+EVENTS_MAX_RESULTS = int(os.getenv('EVENTS_MAX_RESULTS', '1000'))
+
+
+def list_event_page(
+    memory_id: str,
+    actor_id: str,
+    session_id: str,
+    region: str,
+    page_size: int = EVENTS_PAGE_SIZE,
+    next_token: Optional[str] = None
+) -> Tuple[List[Dict], Optional[str]]:
+    """One list_events call: a page of events (newest first) and the token of the next, older page"""
+    params = {
+        'memoryId': memory_id,
+        'actorId': actor_id,
+        'sessionId': session_id,
+        'maxResults': min(page_size, 100)
+    }
+    if next_token:
+        params['nextToken'] = next_token
+    response = get_client('bedrock-agentcore', region).list_events(**params)
+    return response.get('events', []), response.get('nextToken')
+
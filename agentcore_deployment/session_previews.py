@@ -0,0 +1,54 @@
+"""
+Parallel session previews for the Sessions page
+Reads the transcripts of every visible session at once on a bounded thread
+pool, so the overview costs about one session's read instead of one per row,
+and yields each preview as soon as it is ready so rows fill in progressively
+"""
+import os
+from concurrent.futures import ThreadPoolExecutor, TimeoutError, as_completed
+from typing import Dict, Iterable, Iterator, Optional, Tuple
+
+from transcript_cache import get_transcript_cache
+
+# Concurrent preview reads, one per visible row by default (override via environment)
+SESSION_PREVIEW_WORKERS = int(os.getenv('SESSION_PREVIEW_WORKERS', '10'))
+# Newest messages read per preview, about one events page, so a cold preview costs
+# a single round trip; older messages are only read when the session is opened
+SESSION_PREVIEW_MESSAGES = int(os.getenv('SESSION_PREVIEW_MESSAGES', '20'))
+# Seconds to wait for a preview before showing the row without it
+SESSION_PREVIEW_TIMEOUT = float(os.getenv('SESSION_PREVIEW_TIMEOUT', '5'))
+
+# Module level so Streamlit reruns share one pool
+_executor = ThreadPoolExecutor(max_workers=SESSION_PREVIEW_WORKERS, thread_name_prefix='session-preview')
+
+
+def iter_previews(memory_id: str, region: str, actor_id: str, session_ids: Iterable[str],
+                  limit: Optional[int] = SESSION_PREVIEW_MESSAGES,
+                  timeout: float = SESSION_PREVIEW_TIMEOUT) -> Iterator[Tuple[str, Optional[Dict], Optional[str]]]:
+    """Start reading every preview now; the returned iterator yields (session_id, preview, error) in completion order
+
+    ``preview`` is ``TranscriptCache.preview`` output, or None with ``error``
+    set when the read failed or did not finish within ``timeout``. Reads that
+    time out keep running and fill the transcript cache for the next view.
+    """
+    cache = get_transcript_cache(memory_id, region)
+    futures = {
+        _executor.submit(cache.preview, actor_id, session_id, limit): session_id
+        for session_id in session_ids
+    }
+    return _collect(futures, timeout)
+
+
+def _collect(futures: Dict, timeout: float) -> Iterator[Tuple[str, Optional[Dict], Optional[str]]]:
+    pending = dict(futures)
+    try:
+        for future in as_completed(futures, timeout=timeout):
+            session_id = pending.pop(future)
+            try:
+                yield session_id, future.result(), None
+            except Exception as e:
+                print(f"Error loading preview for session {session_id}: {str(e)}")
+                yield session_id, None, str(e)
+    except TimeoutError:
+        for session_id in pending.values():
+            yield session_id, None, f"timed out after {timeout:g}s"
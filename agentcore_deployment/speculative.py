@@ -0,0 +1,96 @@
+"""
+Speculative knowledge base prefetch
+Starts the knowledge base retrieval for messages that look like knowledge base
+questions at the same time as the first model call, so when the model asks
+for knowledge_base_search the results are already there (or on their way)
+"""
+import threading
+from concurrent.futures import Executor, Future
+from typing import Any, Callable, Dict, List, Optional
+
+from retrieval import query_terms
+
+# A message with one strong term, or two weaker ones, is treated as a knowledge base question
+STRONG_TERMS = {'agentic'}
+WEAK_TERMS = {
+    'memory', 'memories', 'agent', 'agents', 'llm', 'llms', 'episodic', 'semantic', 'procedural', 'retrieval',
+    'rag', 'recall', 'context', 'consolidation', 'forgetting', 'persistent', 'vector'
+}
+
+
+class KBPrefetch:
+    """Per-turn slot holding one speculative retrieval"""
+
+    __slots__ = ('message', 'terms', 'future', 'used')
+
+    def __init__(self, message: str, future: Future):
+        self.message = message
+        self.terms = query_terms(message)
+        self.future = future
+        self.used = False
+
+
+class KBSpeculator:
+    """Fires speculative retrievals and serves them to matching tool calls
+
+    ``start`` classifies a message and, if it looks like a knowledge base
+    question, submits ``retrieve(message)`` to ``executor`` and returns the
+    turn's slot. ``take`` hands the slot's future to the first
+    knowledge_base_search call whose query terms are covered by the message
+    terms to at least ``match_threshold``. ``finish`` closes the turn and
+    returns its outcome: ``hit`` (served), ``waste`` (fired but not served).
+    A tool call with no usable slot counts as a ``miss``.
+    """
+
+    def __init__(self, retrieve: Callable[[str], List[Dict]], executor: Executor, match_threshold: float = 0.6):
+        self.retrieve = retrieve
+        self.executor = executor
+        self.match_threshold = match_threshold
+        self._lock = threading.Lock()
+        self.fired = 0
+        self.hits = 0
+        self.wasted = 0
+        self.misses = 0
+
+    @staticmethod
+    def should_prefetch(message: str) -> bool:
+        terms = query_terms(message)
+        return bool(terms & STRONG_TERMS) or len(terms & WEAK_TERMS) >= 2
+
+    def start(self, message: str) -> Optional[KBPrefetch]:
+        """Fire the retrieval for a likely knowledge base question"""
+        if not self.should_prefetch(message):
+            return None
+        with self._lock:
+            self.fired += 1
+        return KBPrefetch(message, self.executor.submit(self.retrieve, message))
+
+    def take(self, prefetch: Optional[KBPrefetch], query: str) -> Optional[Future]:
+        """The prefetched retrieval if it answers this tool query, otherwise None"""
+        terms = query_terms(query)
+        with self._lock:
+            if prefetch is None or prefetch.used or not terms or len(terms & prefetch.terms) / len(terms) < self.match_threshold:
+                self.misses += 1
+                return None
+            prefetch.used = True
+            self.hits += 1
+        return prefetch.future
+
+    def finish(self, prefetch: KBPrefetch) -> str:
+        """Close a turn's slot and return its outcome"""
+        with self._lock:
+            if prefetch.used:
+                return 'hit'
+            self.wasted += 1
+            return 'waste'
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                'fired': self.fired,
+                'hits': self.hits,
+                'wasted': self.wasted,
+                'misses': self.misses,
+                'hit_rate': self.hits / self.fired if self.fired else 0.0,
+                'waste_rate': self.wasted / self.fired if self.fired else 0.0
+            }
@@ -3,9 +3,10 @@ Copilot - Main Chat Page (Clean Multi-Page App)
 """
 import streamlit as st
 import uuid
-import boto3
+from clients import get_client
 import json
 from datetime import datetime
+from typing import Iterator
 
 # Page configuration
 st.set_page_config(
@@ -30,15 +31,16 @@ def initialize_session_state():
     if 'runtime_session_id' not in st.session_state:
         st.session_state.runtime_session_id = f"streamlit_session_{uuid.uuid4().hex}"
 
-def invoke_agentcore_runtime(message: str) -> str:
-    """Invoke the AgentCore Runtime agent"""
+def stream_agentcore_runtime(message: str) -> Iterator[str]:
+    """Invoke the AgentCore Runtime agent and yield response text as it arrives"""
     try:
-        client = boto3.client('bedrock-agentcore', region_name=REGION)
+        client = get_client('bedrock-agentcore', REGION)
         
         payload_dict = {
             "prompt": message,
             "actor_id": st.session_state.actor_id,
-            "session_id": st.session_state.session_id
+            "session_id": st.session_state.session_id,
+            "stream": True
         }
         
         payload_bytes = json.dumps(payload_dict).encode('utf-8')
@@ -50,18 +52,42 @@ def invoke_agentcore_runtime(message: str) -> str:
             qualifier="DEFAULT"
         )
         
-        if response['statusCode'] == 200:
-            response_body = response.get('response')
-            if response_body:
-                content = response_body.read().decode('utf-8')
-                return content
-            else:
-                return "No response received from agent"
-        else:
-            return f"Error: Agent returned status code {response['statusCode']}"
+        if response['statusCode'] != 200:
+            yield f"Error: Agent returned status code {response['statusCode']}"
+            return
+        
+        response_body = response.get('response')
+        if not response_body:
+            yield "No response received from agent"
+            return
+        
+        if "text/event-stream" not in response.get('contentType', ''):
+            # Non-streaming runtime, the body is a single JSON value
+            content = response_body.read().decode('utf-8')
+            yield _decode_event(content)
+            return
+        
+        # Server-sent events: one "data: <json>" line per streamed chunk
+        for line in response_body.iter_lines(chunk_size=64):
+            line = line.decode('utf-8')
+            if line.startswith("data: "):
+                yield _decode_event(line[len("data: "):])
             
     except Exception as e:
-        return f"Error invoking AgentCore Runtime: {str(e)}"
+        yield f"Error invoking AgentCore Runtime: {str(e)}"
+
+def _decode_event(data: str) -> str:
+    """Decode one streamed event into display text"""
+    try:
+        event = json.loads(data)
+    except json.JSONDecodeError:
+        return data
+    
+    if isinstance(event, str):
+        return event
+    if isinstance(event, dict) and 'error' in event:
+        return f"Error: {event['error']}"
+    return ""
 
 def display_header():
     """Display clean header"""
@@ -111,28 +137,34 @@ def display_chat_interface():
         
         # Get agent response
         with st.chat_message("assistant"):
-            with st.spinner("Thinking..."):
-                try:
-                    response = invoke_agentcore_runtime(prompt)
-                    st.markdown(response)
-                    
-                    response_timestamp = datetime.now().strftime("%H:%M:%S")
-                    st.caption(f"*{response_timestamp}*")
-                    
-                    st.session_state.messages.append({
-                        "role": "assistant", 
-                        "content": response,
-                        "timestamp": response_timestamp
-                    })
-                    
-                except Exception as e:
-                    error_msg = f"Error: {str(e)}"
-                    st.error(error_msg)
-                    st.session_state.messages.append({
-                        "role": "assistant", 
-                        "content": error_msg,
-                        "timestamp": datetime.now().strftime("%H:%M:%S")
-                    })
+            try:
+                placeholder = st.empty()
+                placeholder.markdown("Thinking...")
+                
+                # Render tokens as they arrive
+                response = ""
+                for chunk in stream_agentcore_runtime(prompt):
+                    response += chunk
+                    placeholder.markdown(response + "▌")
+                placeholder.markdown(response)
+                
+                response_timestamp = datetime.now().strftime("%H:%M:%S")
+                st.caption(f"*{response_timestamp}*")
+                
+                st.session_state.messages.append({
+                    "role": "assistant", 
+                    "content": response,
+                    "timestamp": response_timestamp
+                })
+                
+            except Exception as e:
+                error_msg = f"Error: {str(e)}"
+                st.error(error_msg)
+                st.session_state.messages.append({
+                    "role": "assistant", 
+                    "content": error_msg,
+                    "timestamp": datetime.now().strftime("%H:%M:%S")
+                })
 
 def main():
     """Main chat page"""
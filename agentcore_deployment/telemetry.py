@@ -0,0 +1,209 @@
+"""
+Per-phase latency spans for a Copilot agent turn
+Emits named OpenTelemetry spans for memory restore and write-back, every model
+call (with guardrail attributes) and every tool call, and keeps a compact
+timing breakdown of the last turn for the runtime response metadata
+"""
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, Optional
+
+from opentelemetry import trace
+from opentelemetry.trace import Span, Status, StatusCode
+from strands.hooks import (
+    AfterModelCallEvent,
+    AfterToolCallEvent,
+    BeforeModelCallEvent,
+    BeforeToolCallEvent,
+    HookProvider,
+    HookRegistry,
+)
+from bedrock_agentcore.memory.integrations.strands.session_manager import AgentCoreMemorySessionManager
+
+# No-op unless an SDK is configured (opentelemetry-instrument in the container)
+tracer = trace.get_tracer("copilot")
+
+
+def _ms(seconds: float) -> int:
+    return int(seconds * 1000)
+
+
+def _guardrail_latency_ms(guardrail_trace: Dict[str, Any]) -> int:
+    """Sum the processing latency Bedrock reports for input and output assessments"""
+    assessments = list(guardrail_trace.get('inputAssessment', {}).values())
+    for output_assessments in guardrail_trace.get('outputAssessments', {}).values():
+        assessments.extend(output_assessments)
+    return sum(
+        assessment.get('invocationMetrics', {}).get('guardrailProcessingLatency', 0)
+        for assessment in assessments
+    )
+
+
+class PhaseTimer(HookProvider):
+    """Strands hook provider that traces and times the phases of each turn
+
+    Model and tool calls are timed from Strands hooks; guardrail latency and
+    time to first token come from the model stream (``on_stream_event`` is
+    meant to be the agent's callback handler); memory phases are reported by
+    ``TracedMemorySessionManager``. Phases that happen between turns (e.g. the
+    memory restore when the agent is built) are counted towards the next turn.
+    """
+
+    def __init__(self, attributes: Optional[Dict[str, str]] = None):
+        self.attributes = attributes or {}
+        self.timings: Dict[str, Any] = {}
+        self.last_timings: Dict[str, Any] = {}
+        self._lock = threading.Lock()
+        self._turn_span: Optional[Span] = None
+        self._model_span: Optional[Span] = None
+        self._model_started = 0.0
+        self._first_token_seen = False
+        self._tool_spans: Dict[str, Any] = {}
+
+    def register_hooks(self, registry: HookRegistry, **kwargs: Any) -> None:
+        registry.add_callback(BeforeModelCallEvent, self._on_before_model_call)
+        registry.add_callback(AfterModelCallEvent, self._on_after_model_call)
+        registry.add_callback(BeforeToolCallEvent, self._on_before_tool_call)
+        registry.add_callback(AfterToolCallEvent, self._on_after_tool_call)
+
+    @contextmanager
+    def turn(self) -> Iterator[Span]:
+        """Span one chat turn; on exit the breakdown is moved to ``last_timings``"""
+        started = time.perf_counter()
+        span = tracer.start_span("copilot.turn", attributes=self.attributes)
+        self._turn_span = span
+        try:
+            yield span
+        except BaseException as e:
+            span.record_exception(e)
+            span.set_status(Status(StatusCode.ERROR))
+            raise
+        finally:
+            self._turn_span = None
+            with self._lock:
+                timings, self.timings = self.timings, {}
+            timings['total_ms'] = _ms(time.perf_counter() - started)
+            for name, value in timings.items():
+                if not isinstance(value, dict):
+                    span.set_attribute(f"copilot.{name}", value)
+            span.end()
+            self.last_timings = timings
+
+    @contextmanager
+    def phase(self, name: str, attributes: Optional[Dict[str, Any]] = None) -> Iterator[Span]:
+        """Span a phase of the current turn and add its duration to ``<name>_ms``"""
+        started = time.perf_counter()
+        span = self._start_span(f"copilot.{name}", attributes or {})
+        try:
+            yield span
+        except BaseException as e:
+            span.record_exception(e)
+            span.set_status(Status(StatusCode.ERROR))
+            raise
+        finally:
+            self._add(f"{name}_ms", _ms(time.perf_counter() - started))
+            span.end()
+
+    def annotate(self, name: str, value: Any) -> None:
+        """Attach a value to the current turn (span attribute and ``last_timings`` entry)"""
+        with self._lock:
+            self.timings[name] = value
+
+    def on_stream_event(self, **kwargs: Any) -> None:
+        """Callback handler picking time to first token and guardrail traces off the model stream"""
+        chunk = kwargs.get('event')
+        if not isinstance(chunk, dict) or self._model_span is None:
+            return
+        if not self._first_token_seen and 'contentBlockDelta' in chunk:
+            self._first_token_seen = True
+            ttft = _ms(time.perf_counter() - self._model_started)
+            self._model_span.set_attribute('copilot.model.ttft_ms', ttft)
+            with self._lock:
+                self.timings.setdefault('model_ttft_ms', ttft)
+        guardrail_trace = chunk.get('metadata', {}).get('trace', {}).get('guardrail')
+        if guardrail_trace:
+            latency = _guardrail_latency_ms(guardrail_trace)
+            self._model_span.set_attribute('copilot.guardrail.latency_ms', latency)
+            self._add('guardrail_ms', latency)
+
+    def _start_span(self, name: str, attributes: Dict[str, Any]) -> Span:
+        # Parent explicitly on the turn span: hook callbacks and generator
+        # resumptions do not share a context we could attach to
+        context = trace.set_span_in_context(self._turn_span) if self._turn_span else None
+        return tracer.start_span(name, context=context, attributes={**self.attributes, **attributes})
+
+    def _add(self, key: str, value: int) -> None:
+        with self._lock:
+            self.timings[key] = self.timings.get(key, 0) + value
+
+    def _on_before_model_call(self, event: BeforeModelCallEvent) -> None:
+        self._model_started = time.perf_counter()
+        self._first_token_seen = False
+        self._model_span = self._start_span("copilot.model_call", {})
+
+    def _on_after_model_call(self, event: AfterModelCallEvent) -> None:
+        span, self._model_span = self._model_span, None
+        if span is None:
+            return
+        self._add('model_ms', _ms(time.perf_counter() - self._model_started))
+        self._add('model_calls', 1)
+        if event.exception:
+            span.record_exception(event.exception)
+            span.set_status(Status(StatusCode.ERROR))
+        elif event.stop_response:
+            stop_reason = event.stop_response.stop_reason
+            span.set_attribute('copilot.model.stop_reason', stop_reason)
+            if stop_reason == 'guardrail_intervened':
+                span.set_attribute('copilot.guardrail.intervened', True)
+                with self._lock:
+                    self.timings['guardrail_intervened'] = True
+        span.end()
+
+    def _on_before_tool_call(self, event: BeforeToolCallEvent) -> None:
+        name = event.tool_use['name']
+        span = self._start_span(f"copilot.tool.{name}", {'copilot.tool.name': name})
+        self._tool_spans[event.tool_use['toolUseId']] = (span, time.perf_counter())
+
+    def _on_after_tool_call(self, event: AfterToolCallEvent) -> None:
+        entry = self._tool_spans.pop(event.tool_use['toolUseId'], None)
+        if entry is None:
+            return
+        span, started = entry
+        name = event.tool_use['name']
+        elapsed = _ms(time.perf_counter() - started)
+        with self._lock:
+            tools = self.timings.setdefault('tools_ms', {})
+            tools[name] = tools.get(name, 0) + elapsed
+        if event.exception:
+            span.record_exception(event.exception)
+        if event.exception or event.result.get('status') == 'error':
+            span.set_status(Status(StatusCode.ERROR))
+        span.end()
+
+
+class TracedMemorySessionManager(AgentCoreMemorySessionManager):
+    """AgentCore memory session manager reporting restore, retrieval and write-back phases"""
+
+    def __init__(self, phase_timer: PhaseTimer, **kwargs: Any):
+        self.phase_timer = phase_timer
+        super().__init__(**kwargs)
+
+    def initialize(self, agent: Any, **kwargs: Any) -> None:
+        with self.phase_timer.phase("memory_restore"):
+            super().initialize(agent, **kwargs)
+
+    def append_message(self, message: Any, agent: Any, **kwargs: Any) -> None:
+        with self.phase_timer.phase("memory_write", {'copilot.memory.operation': "append_message"}):
+            super().append_message(message, agent, **kwargs)
+
+    def sync_agent(self, agent: Any, **kwargs: Any) -> None:
+        with self.phase_timer.phase("memory_write", {'copilot.memory.operation': "sync_agent"}):
+            super().sync_agent(agent, **kwargs)
+
+    def retrieve_customer_context(self, event: Any) -> None:
+        if not self.config.retrieval_config:
+            # Nothing to retrieve, keep the breakdown free of empty phases
+            return super().retrieve_customer_context(event)
+        with self.phase_timer.phase("memory_retrieve"):
+            super().retrieve_customer_context(event)
@@ -0,0 +1,116 @@
+"""
+Delta and pagination reads of TranscriptCache
+
+A fake ``list_event_page`` serves a session's events newest first with
+``nextToken`` pagination, so these tests check which pages the cache reads
+and that the records it returns and keeps stay newest first without gaps.
+"""
+import json
+import os
+import sys
+import unittest
+from datetime import datetime, timedelta, timezone
+from unittest import mock
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+import transcript_cache  # noqa: E402
+from transcript_cache import TranscriptCache  # noqa: E402
+
+ACTOR_ID = 'actor-1'
+SESSION_ID = 'session-1'
+START = datetime(2026, 1, 1, tzinfo=timezone.utc)
+
+
+class FakeEventStore:
+    """One session's events, served like list_events (newest first, nextToken pages)"""
+
+    def __init__(self, count: int = 0):
+        self.events = []
+        self.calls = []
+        self.add(count)
+
+    def add(self, count: int) -> None:
+        for _ in range(count):
+            index = len(self.events)
+            message = {'role': 'user' if index % 2 == 0 else 'assistant', 'content': [{'text': f"m{index}"}]}
+            self.events.append({
+                'eventId': f"{index:013d}#event",
+                'eventTimestamp': START + timedelta(seconds=index),
+                'payload': [{'conversational': {'role': 'USER', 'content': {'text': json.dumps({'message': message})}}}]
+            })
+
+    def list_event_page(self, memory_id, actor_id, session_id, region, page_size=50, next_token=None):
+        self.calls.append((page_size, next_token))
+        newest_first = self.events[::-1]
+        # Tokens point at an event, so they stay valid when newer events arrive
+        start = next(i for i, event in enumerate(newest_first) if event['eventId'] == next_token) if next_token else 0
+        page = newest_first[start:start + page_size]
+        end = start + len(page)
+        return page, (newest_first[end]['eventId'] if end < len(newest_first) else None)
+
+
+def texts(records):
+    return [record['text'] for record in records]
+
+
+def newest(first: int, last: int = 0):
+    return [f"m{index}" for index in range(first, last - 1, -1)]
+
+
+class TranscriptCacheTest(unittest.TestCase):
+
+    def setUp(self):
+        self.store = FakeEventStore()
+        patcher = mock.patch.object(transcript_cache, 'list_event_page', self.store.list_event_page)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.cache = TranscriptCache('memory-000001', 'us-east-1', page_size=50)
+
+    def test_first_read_follows_pagination(self):
+        self.store.add(120)
+
+        self.assertEqual(texts(self.cache.get(ACTOR_ID, SESSION_ID)), newest(119))
+        self.assertEqual(len(self.store.calls), 3)
+        self.assertEqual(self.cache.preview(ACTOR_ID, SESSION_ID, 20)['first']['text'], 'm0')
+
+    def test_delta_shorter_than_a_page(self):
+        self.store.add(30)
+        self.cache.get(ACTOR_ID, SESSION_ID)
+        self.store.add(3)
+        self.store.calls.clear()
+
+        self.assertEqual(texts(self.cache.get(ACTOR_ID, SESSION_ID)), newest(32))
+        # One small call reaches the cached events
+        self.assertEqual(self.store.calls, [(5, None)])
+
+    def test_delta_longer_than_a_page_with_limit(self):
+        self.store.add(5)
+        self.cache.preview(ACTOR_ID, SESSION_ID, 5)
+        self.store.add(120)
+
+        preview = self.cache.preview(ACTOR_ID, SESSION_ID, 20)
+        # Delta pages grow from the small first call up to the page size
+        self.assertEqual([size for size, _ in self.store.calls[-4:]], [5, 20, 50, 50])
+        self.assertEqual(preview['count'], 125)
+        self.assertEqual(preview['last']['text'], 'm124')
+        self.assertEqual(preview['first']['text'], 'm0')
+        self.assertEqual(texts(self.cache.get(ACTOR_ID, SESSION_ID, 20)), newest(124, 105))
+        self.assertEqual(texts(self.cache.get(ACTOR_ID, SESSION_ID)), newest(124))
+
+    def test_older_reads_continue_from_the_stored_token(self):
+        self.store.add(120)
+        self.assertEqual(texts(self.cache.get(ACTOR_ID, SESSION_ID, 10)), newest(119, 110))
+        self.assertEqual(self.store.calls, [(50, None)])
+        self.assertFalse(self.cache.preview(ACTOR_ID, SESSION_ID, 10)['complete'])
+        self.store.calls.clear()
+
+        self.assertEqual(texts(self.cache.get(ACTOR_ID, SESSION_ID)), newest(119))
+        # One delta call finds nothing new, then the older pages from where the first read stopped
+        self.assertEqual(self.store.calls, [
+            (5, None), (50, self.store.events[69]['eventId']), (50, self.store.events[19]['eventId'])
+        ])
+        self.assertTrue(self.cache.preview(ACTOR_ID, SESSION_ID, 10)['complete'])
+
+
+if __name__ == '__main__':
+    unittest.main()
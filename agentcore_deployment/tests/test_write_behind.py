@@ -0,0 +1,142 @@
+"""
+Flush path of WriteBehindSessionManager against the pinned bedrock-agentcore
+
+The manager redirects the integration's private ``_flush_messages`` hook, so
+these tests drive real buffered messages through the library's batching code
+with a fake data plane client and check what would reach AgentCore memory.
+"""
+import os
+import sys
+import unittest
+from datetime import datetime, timezone
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+from bedrock_agentcore.memory.integrations.strands.config import AgentCoreMemoryConfig  # noqa: E402
+from strands.types.session import SessionMessage  # noqa: E402
+
+from write_behind import MemoryWriter, WriteBehindSessionManager  # noqa: E402
+
+SESSION_ID = 'session-1'
+
+
+class FakeDataPlane:
+    """Records create_event calls, failing the first ``failures`` of them"""
+
+    def __init__(self, failures: int = 0):
+        self.failures = failures
+        self.events = []
+
+    def list_events(self, **kwargs):
+        return {'events': []}
+
+    def create_event(self, **kwargs):
+        if self.failures:
+            self.failures -= 1
+            raise RuntimeError("memory unavailable")
+        self.events.append(kwargs)
+        return {'eventId': f"event-{len(self.events)}"}
+
+
+class FakeBotoSession:
+    """Hands the fake data plane to the session manager in place of boto3 clients"""
+
+    region_name = 'us-east-1'
+
+    def __init__(self, data_plane: FakeDataPlane):
+        self.data_plane = data_plane
+
+    def client(self, service_name, **kwargs):
+        return self.data_plane
+
+
+def make_manager(writer: MemoryWriter, data_plane: FakeDataPlane, batch_size: int = 32) -> WriteBehindSessionManager:
+    failures, data_plane.failures = data_plane.failures, 0
+    manager = WriteBehindSessionManager(
+        writer=writer,
+        batch_size=batch_size,
+        agentcore_memory_config=AgentCoreMemoryConfig(memory_id='memory-000001', session_id=SESSION_ID, actor_id='actor-1'),
+        region_name='us-east-1',
+        boto_session=FakeBotoSession(data_plane)
+    )
+    # Construction writes the session record; only message events matter here
+    data_plane.events.clear()
+    data_plane.failures = failures
+    return manager
+
+
+def buffer_messages(manager: WriteBehindSessionManager, texts, start: int = 0) -> None:
+    for index, text in enumerate(texts, start):
+        message = SessionMessage(
+            message={'role': 'user' if index % 2 == 0 else 'assistant', 'content': [{'text': text}]},
+            message_id=index,
+            created_at=datetime(2026, 1, 1, 0, 0, index, tzinfo=timezone.utc).isoformat()
+        )
+        manager.create_message(SESSION_ID, 'default', message)
+
+
+def written_texts(data_plane: FakeDataPlane):
+    return [
+        item['conversational']['content']['text']
+        for event in data_plane.events
+        for item in event['payload']
+        if 'conversational' in item
+    ]
+
+
+class WriteBehindFlushTest(unittest.TestCase):
+
+    def test_end_of_turn_flush_is_written_in_the_background(self):
+        data_plane = FakeDataPlane()
+        manager = make_manager(MemoryWriter(retries=0), data_plane)
+        buffer_messages(manager, ['question', 'answer'])
+
+        # What the integration's end-of-turn hook calls
+        self.assertEqual(manager._flush_messages(), [])
+        manager.wait_for_flush()
+
+        self.assertEqual(len(data_plane.events), 1)
+        self.assertIn('question', written_texts(data_plane)[0])
+        self.assertIn('answer', written_texts(data_plane)[1])
+        self.assertEqual(manager.pending_count(), 0)
+
+    def test_failed_flush_is_retried_in_order(self):
+        data_plane = FakeDataPlane(failures=2)
+        manager = make_manager(MemoryWriter(retries=3, backoff=0), data_plane)
+        buffer_messages(manager, ['first', 'second'])
+        manager.schedule_flush()
+        manager.wait_for_flush()
+
+        buffer_messages(manager, ['third', 'fourth'], start=2)
+        manager.close()
+
+        texts = written_texts(data_plane)
+        self.assertEqual(len(texts), 4)
+        for position, expected in enumerate(['first', 'second', 'third', 'fourth']):
+            self.assertIn(expected, texts[position])
+
+    def test_events_stay_buffered_until_a_flush_succeeds(self):
+        data_plane = FakeDataPlane(failures=1)
+        writer = MemoryWriter(retries=0)
+        manager = make_manager(writer, data_plane)
+        buffer_messages(manager, ['kept'])
+        manager.schedule_flush()
+        manager.wait_for_flush()
+
+        self.assertEqual(data_plane.events, [])
+        self.assertEqual(manager.pending_count(), 1)
+        self.assertEqual(writer.failures, 1)
+
+        self.assertTrue(writer.drain(manager))
+        self.assertIn('kept', written_texts(data_plane)[0])
+
+    def test_full_batch_is_written_inline(self):
+        data_plane = FakeDataPlane()
+        manager = make_manager(MemoryWriter(retries=0), data_plane, batch_size=2)
+        buffer_messages(manager, ['one', 'two'])
+
+        self.assertEqual(len(data_plane.events), 1)
+        self.assertEqual(manager.pending_count(), 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,269 @@
+"""
+Incremental transcript cache for the Sessions page
+Keeps each viewed session's messages decoded into compact records (role and
+display text) keyed by event ID, so reopening a session only reads the events
+written since the last view instead of re-downloading and re-parsing it
+"""
+import json
+import os
+import threading
+from collections import OrderedDict
+from typing import Dict, Iterator, List, Optional, Tuple
+
+from session_events import EVENTS_PAGE_SIZE, list_event_page
+
+# Sessions whose decoded transcript is kept (least recently viewed dropped first)
+TRANSCRIPT_CACHE_MAX_SESSIONS = int(os.getenv('TRANSCRIPT_CACHE_MAX_SESSIONS', '32'))
+# Events asked for by the first delta call of a cached session; later delta pages grow 4x up to the page size
+TRANSCRIPT_DELTA_PAGE_SIZE = int(os.getenv('TRANSCRIPT_DELTA_PAGE_SIZE', '5'))
+
+
+def _display_text(message: Dict) -> str:
+    for content_item in message.get('content', []):
+        if 'text' in content_item:
+            return content_item['text']
+        if 'toolUse' in content_item:
+            return f"[Used tool: {content_item['toolUse'].get('name', 'unknown_tool')}]"
+        if 'toolResult' in content_item:
+            return "[Tool result]"
+    return ""
+
+
+def decode_event(event: Dict) -> List[Dict]:
+    """Compact message records of one event, in the order they were written
+
+    Each record is ``{'event_id', 'timestamp', 'role', 'text'}``. An event can carry
+    several messages when memory writes are batched; agent state blobs and
+    payloads that do not decode are skipped.
+    """
+    records = []
+    for item in event.get('payload', []):
+        try:
+            if 'conversational' in item:
+                message = json.loads(item['conversational']['content']['text'])['message']
+            elif 'blob' in item:
+                blob = json.loads(item['blob'])
+                if not (isinstance(blob, list) and len(blob) == 2):
+                    continue
+                message = json.loads(blob[0])['message']
+            else:
+                continue
+        except (KeyError, TypeError, ValueError):
+            continue
+        records.append({
+            'event_id': event.get('eventId'),
+            'timestamp': event.get('eventTimestamp'),
+            'role': message.get('role'),
+            'text': _display_text(message)
+        })
+    return records
+
+
+def _event_order(record: Dict) -> Tuple:
+    # Event IDs start with the event time, they only break timestamp ties
+    timestamp = record.get('timestamp')
+    return (timestamp.timestamp() if timestamp is not None else 0.0, record.get('event_id') or '')
+
+
+class _Transcript:
+    """Decoded records of one session, newest first, and where to continue reading older events"""
+
+    __slots__ = ('records', 'event_ids', 'older_token', 'complete')
+
+    def __init__(self):
+        self.records: List[Dict] = []
+        self.event_ids = set()
+        self.older_token: Optional[str] = None
+        self.complete = False
+
+
+class TranscriptCache:
+    """Per-(actor, session) cache of decoded transcripts with LRU eviction
+
+    ``iter_pages`` yields message records newest first: the events written
+    since the session was last read (one small ``list_events`` call when
+    there are few), then the cached records, then older events still needed
+    to reach ``limit``, continuing from the stored pagination token. Pages
+    are yielded as they arrive so viewers can render incrementally.
+    """
+
+    def __init__(self, memory_id: str, region: str, max_sessions: int = TRANSCRIPT_CACHE_MAX_SESSIONS,
+                 page_size: int = EVENTS_PAGE_SIZE, delta_page_size: int = TRANSCRIPT_DELTA_PAGE_SIZE):
+        self.memory_id = memory_id
+        self.region = region
+        self.max_sessions = max_sessions
+        self.page_size = page_size
+        self.delta_page_size = min(delta_page_size, page_size)
+        self._transcripts: "OrderedDict[Tuple[str, str], _Transcript]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.delta_calls = 0
+        self.older_calls = 0
+        self.events_decoded = 0
+
+    def iter_pages(self, actor_id: str, session_id: str, limit: Optional[int] = None) -> Iterator[List[Dict]]:
+        """Yield pages of message records, newest first, up to ``limit`` records (None for all)"""
+        transcript = self._transcript(actor_id, session_id)
+        with self._lock:
+            # Snapshot: concurrent readers of this session merge into the live set
+            cached_ids = set(transcript.event_ids)
+        first_read = not cached_ids
+        returned = 0
+        last = None
+
+        # Events newer than the cached ones (a first read starts here too), up to the first known event
+        new_records: List[Dict] = []
+        new_event_ids = set()
+        next_token = None
+        reached_end = False
+        # Usually only a few events are new: start small, grow if the cached ones are not reached
+        page_size = self.page_size if first_read else self.delta_page_size
+        while True:
+            events, next_token = self._read(actor_id, session_id, next_token, page_size)
+            self.delta_calls += 1
+            page_size = min(page_size * 4, self.page_size)
+            fresh = []
+            for event in events:
+                if event.get('eventId') in cached_ids:
+                    break
+                fresh.append(event)
+            new_event_ids.update(event.get('eventId') for event in fresh)
+            records = self._decode(fresh)
+            new_records.extend(records)
+            # Past the limit keep reading (without yielding) up to the cached
+            # events, so the cache never has a gap below the new ones
+            if records and (limit is None or returned < limit):
+                page = records[:limit - returned] if limit is not None else records
+                yield page
+                returned += len(page)
+                last = _event_order(page[-1])
+            if len(fresh) < len(events) or next_token is None:
+                reached_end = first_read
+                break
+            if first_read and limit is not None and returned >= limit:
+                break
+
+        with self._lock:
+            self._merge_locked(transcript, new_records, new_event_ids)
+            if reached_end:
+                transcript.complete = True
+            elif first_read and not transcript.complete:
+                # Remember where older events continue for a later, longer view
+                transcript.older_token = next_token
+
+        # Then cached records, reading older events into the cache while more are needed.
+        # Another reader of this session may fill the cache meanwhile, so always
+        # continue from the cache below the last record yielded.
+        while limit is None or returned < limit:
+            with self._lock:
+                older = [record for record in transcript.records if last is None or _event_order(record) < last]
+                complete = transcript.complete
+                older_token = transcript.older_token
+            if older:
+                page = older[:limit - returned] if limit is not None else older
+                yield page
+                returned += len(page)
+                last = _event_order(page[-1])
+                continue
+            if complete:
+                break
+            try:
+                events, next_token = self._read(actor_id, session_id, older_token)
+            except Exception:
+                # Pagination tokens expire; start over on the next view
+                self.invalidate(actor_id, session_id)
+                raise
+            self.older_calls += 1
+            with self._lock:
+                self._merge_locked(transcript, self._decode(events), {event.get('eventId') for event in events})
+                if not transcript.complete and transcript.older_token == older_token:
+                    transcript.older_token = next_token
+                    transcript.complete = next_token is None
+
+    def get(self, actor_id: str, session_id: str, limit: Optional[int] = None) -> List[Dict]:
+        """Message records of a session, newest first"""
+        records = []
+        for page in self.iter_pages(actor_id, session_id, limit):
+            records.extend(page)
+        return records
+
+    def preview(self, actor_id: str, session_id: str, limit: Optional[int] = None) -> Dict:
+        """Message count, first and last message and last update of a session
+
+        Reads at most ``limit`` records. The count and first message are only
+        exact (``complete``) once the whole transcript is cached, e.g. for short
+        sessions or after a full view; otherwise the count is a lower bound and
+        ``first`` is None.
+        """
+        records = self.get(actor_id, session_id, limit)
+        with self._lock:
+            transcript = self._transcripts.get((actor_id, session_id))
+            complete = bool(transcript and transcript.complete)
+            if complete:
+                records = transcript.records
+        return {
+            'count': len(records),
+            'complete': complete,
+            'first': records[-1] if records and complete else None,
+            'last': records[0] if records else None,
+            'updated': records[0]['timestamp'] if records else None
+        }
+
+    def invalidate(self, actor_id: Optional[str] = None, session_id: Optional[str] = None) -> None:
+        """Drop one session's transcript, an actor's transcripts, or everything"""
+        with self._lock:
+            for key in list(self._transcripts):
+                if (actor_id is None or key[0] == actor_id) and (session_id is None or key[1] == session_id):
+                    del self._transcripts[key]
+
+    def stats(self) -> Dict:
+        with self._lock:
+            return {
+                'sessions': len(self._transcripts),
+                'records': sum(len(transcript.records) for transcript in self._transcripts.values()),
+                'delta_calls': self.delta_calls,
+                'older_calls': self.older_calls,
+                'events_decoded': self.events_decoded
+            }
+
+    def _transcript(self, actor_id: str, session_id: str) -> _Transcript:
+        key = (actor_id, session_id)
+        with self._lock:
+            transcript = self._transcripts.get(key)
+            if transcript is None:
+                transcript = self._transcripts[key] = _Transcript()
+            self._transcripts.move_to_end(key)
+            while len(self._transcripts) > self.max_sessions:
+                self._transcripts.popitem(last=False)
+            return transcript
+
+    @staticmethod
+    def _merge_locked(transcript: _Transcript, records: List[Dict], event_ids: set) -> None:
+        # Concurrent readers of a session (card view, preview pool) merge overlapping
+        # or out-of-order ranges; keep one copy of each event, newest first
+        fresh = [record for record in records if record['event_id'] not in transcript.event_ids]
+        transcript.event_ids.update(event_ids)
+        if fresh:
+            # Stable, so messages of one event keep their order
+            transcript.records = sorted(fresh + transcript.records, key=_event_order, reverse=True)
+
+    def _read(self, actor_id: str, session_id: str, next_token: Optional[str],
+              page_size: Optional[int] = None) -> Tuple[List[Dict], Optional[str]]:
+        return list_event_page(self.memory_id, actor_id, session_id, self.region, page_size or self.page_size, next_token)
+
+    def _decode(self, events: List[Dict]) -> List[Dict]:
+        self.events_decoded += len(events)
+        # Events arrive newest first; messages inside an event are oldest first
+        return [record for event in events for record in reversed(decode_event(event))]
+
+
+_caches: Dict[Tuple[str, str], TranscriptCache] = {}
+_caches_lock = threading.Lock()
+
+
+def get_transcript_cache(memory_id: str, region: str) -> TranscriptCache:
+    """Process-wide transcript cache for a memory (survives Streamlit reruns)"""
+    with _caches_lock:
+        cache = _caches.get((memory_id, region))
+        if cache is None:
+            cache = _caches[(memory_id, region)] = TranscriptCache(memory_id, region)
+        return cache
@@ -0,0 +1,254 @@
+"""
+Local vector index tier in front of the Bedrock knowledge base
+Keeps embeddings of knowledge base chunks in a memory-mapped NumPy matrix and
+answers queries whose best match is close enough locally, so only uncertain
+queries pay for a remote retrieve. The index is built from an exported
+snapshot (see ``python vector_index.py build``) or grows from past remote
+retrieval results.
+"""
+import argparse
+import atexit
+import hashlib
+import json
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, Iterable, List, Optional
+
+import numpy as np
+
+from clients import get_client
+from retrieval import kb_source
+
+VECTORS_FILE = 'vectors.npy'
+PASSAGES_FILE = 'passages.jsonl'
+# Written last by every save: the number of chunks both files are known to hold
+MANIFEST_FILE = 'index.json'
+
+# Titan text embeddings accept about 50k characters; chunks are far smaller
+MAX_EMBED_CHARS = 20000
+
+Embedder = Callable[[str], np.ndarray]
+
+
+def titan_embedder(model_id: str, region: str, dimensions: int = 512) -> Embedder:
+    """Embed text with a Bedrock Titan text embeddings model (unit-length vectors)"""
+    def embed(text: str) -> np.ndarray:
+        client = get_client('bedrock-runtime', region)
+        response = client.invoke_model(
+            modelId=model_id,
+            body=json.dumps({'inputText': text[:MAX_EMBED_CHARS], 'dimensions': dimensions, 'normalize': True})
+        )
+        return np.asarray(json.loads(response['body'].read())['embedding'], dtype=np.float32)
+    return embed
+
+
+def chunk_id(result: Dict) -> str:
+    """Stable identity of a knowledge base chunk (text and source)"""
+    text = result.get('content', {}).get('text', '')
+    return hashlib.sha1(f"{kb_source(result)}\n{text}".encode('utf-8')).hexdigest()
+
+
+def _as_result(record: Dict) -> Dict:
+    """Accept retrieval results as returned by Bedrock, or flat {"text", "source"} export rows"""
+    if 'content' in record:
+        return {'content': record['content'], 'location': record.get('location', {}), 'metadata': record.get('metadata', {})}
+    location = {'s3Location': {'uri': record['source']}} if record.get('source') else {}
+    return {'content': {'text': record.get('text', '')}, 'location': location, 'metadata': record.get('metadata', {})}
+
+
+class VectorIndex:
+    """Cosine-similarity index over knowledge base chunks
+
+    ``vectors.npy`` (float32, one unit-length row per chunk) is opened with
+    ``mmap_mode='r'``, so opening costs nothing and pages are read on first
+    search. ``search`` returns results in the Bedrock retrieval format, or
+    None when the best match scores below ``min_similarity`` and the caller
+    should ask the remote knowledge base. ``add_results`` embeds new chunks on
+    a background thread; they are searchable immediately and written to disk
+    every ``persist_every`` chunks and at exit. Each save rewrites both files
+    through temporary files and then the manifest, so an interrupted or
+    retried save never misaligns passages and vectors.
+    """
+
+    def __init__(self, path: str, embed: Embedder, min_similarity: float = 0.75, persist_every: int = 32):
+        self.path = path
+        self.embed = embed
+        self.min_similarity = min_similarity
+        self.persist_every = persist_every
+        self._lock = threading.Lock()
+        # Serializes saves (ingest thread, atexit) without blocking searches during I/O
+        self._save_lock = threading.Lock()
+        self._vectors: Optional[np.ndarray] = None
+        self._passages: List[Dict] = []
+        self._ids = set()
+        self._added_vectors: List[np.ndarray] = []
+        self._added_passages: List[Dict] = []
+        self._ingest = ThreadPoolExecutor(max_workers=1, thread_name_prefix='vector-index')
+        self.local_hits = 0
+        self.local_misses = 0
+        self.ingested = 0
+
+        os.makedirs(path, exist_ok=True)
+        self._open()
+        atexit.register(self.save)
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._passages) + len(self._added_passages)
+
+    def search(self, query: str, k: int) -> Optional[List[Dict]]:
+        """Top-k local results if the best one is confident enough, otherwise None"""
+        with self._lock:
+            base, added = self._vectors, list(self._added_vectors)
+            passages = self._passages + self._added_passages
+        if not passages:
+            self.local_misses += 1
+            return None
+
+        scores = self.score(self.embed(query), base, added)
+        top = np.argsort(-scores)[:k]
+        if scores[top[0]] < self.min_similarity:
+            self.local_misses += 1
+            return None
+
+        self.local_hits += 1
+        return [
+            {**passages[i], 'score': float(scores[i]), 'metadata': {**passages[i].get('metadata', {}), 'localIndex': True}}
+            for i in top
+        ]
+
+    @staticmethod
+    def score(query_vector: np.ndarray, base: Optional[np.ndarray], added: List[np.ndarray]) -> np.ndarray:
+        """Cosine similarity of the query against every indexed chunk"""
+        parts = []
+        if base is not None and len(base):
+            parts.append(base @ query_vector)
+        if added:
+            parts.append(np.stack(added) @ query_vector)
+        return np.concatenate(parts)
+
+    def add_results(self, results: List[Dict]) -> None:
+        """Index remote retrieval results in the background"""
+        if results:
+            self._ingest.submit(self._add, [_as_result(result) for result in results])
+
+    def save(self) -> None:
+        """Write chunks added since the last save and re-open the index memory-mapped"""
+        with self._save_lock:
+            with self._lock:
+                if not self._added_passages:
+                    return
+                added_vectors = np.stack(self._added_vectors)
+                vectors = added_vectors if self._vectors is None else np.concatenate([self._vectors, added_vectors])
+                added_passages = list(self._added_passages)
+                passages = self._passages + added_passages
+            try:
+                # Passages first, then vectors, then the manifest that commits the new count;
+                # a crash in between leaves files that still agree on the previous count
+                self._replace(PASSAGES_FILE, lambda f: f.writelines(json.dumps(passage, default=str) + "\n" for passage in passages), 'w')
+                self._replace(VECTORS_FILE, lambda f: np.save(f, vectors.astype(np.float32, copy=False)), 'wb')
+                self._replace(MANIFEST_FILE, lambda f: json.dump({'count': len(passages), 'dimensions': int(vectors.shape[1])}, f), 'w')
+            except Exception as e:
+                print(f"Error saving vector index: {str(e)}")
+                return
+            with self._lock:
+                del self._added_vectors[:len(added_passages)]
+                del self._added_passages[:len(added_passages)]
+                self._open_locked()
+
+    def _replace(self, name: str, write: Callable, mode: str) -> None:
+        tmp_path = os.path.join(self.path, f"{name}.tmp")
+        with open(tmp_path, mode) as f:
+            write(f)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, os.path.join(self.path, name))
+
+    def stats(self) -> Dict:
+        lookups = self.local_hits + self.local_misses
+        return {
+            'chunks': len(self),
+            'local_hits': self.local_hits,
+            'local_misses': self.local_misses,
+            'local_hit_rate': self.local_hits / lookups if lookups else 0.0,
+            'ingested': self.ingested
+        }
+
+    @classmethod
+    def build(cls, path: str, records: Iterable[Dict], embed: Embedder) -> "VectorIndex":
+        """Build (or extend) an index from exported knowledge base chunks"""
+        index = cls(path, embed)
+        index._add([_as_result(record) for record in records])
+        index.save()
+        return index
+
+    def _add(self, results: List[Dict]) -> None:
+        for result in results:
+            text = result.get('content', {}).get('text', '')
+            identity = chunk_id(result)
+            with self._lock:
+                if not text or identity in self._ids:
+                    continue
+                self._ids.add(identity)
+            try:
+                vector = self.embed(text)
+            except Exception as e:
+                with self._lock:
+                    self._ids.discard(identity)
+                print(f"Error embedding knowledge base chunk: {str(e)}")
+                continue
+            with self._lock:
+                self._added_vectors.append(vector)
+                self._added_passages.append(result)
+                should_save = len(self._added_passages) >= self.persist_every
+            self.ingested += 1
+            if should_save:
+                self.save()
+
+    def _open(self) -> None:
+        with self._lock:
+            self._open_locked()
+
+    def _open_locked(self) -> None:
+        vectors_path = os.path.join(self.path, VECTORS_FILE)
+        passages_path = os.path.join(self.path, PASSAGES_FILE)
+        if not os.path.exists(vectors_path) or not os.path.exists(passages_path):
+            return
+        try:
+            vectors = np.load(vectors_path, mmap_mode='r')
+            with open(passages_path) as f:
+                passages = [json.loads(line) for line in f if line.strip()]
+            # Files are rewritten whole, so the first `count` rows of each always line up
+            count = min(len(vectors), len(passages))
+            manifest_path = os.path.join(self.path, MANIFEST_FILE)
+            if os.path.exists(manifest_path):
+                with open(manifest_path) as f:
+                    count = min(count, json.load(f)['count'])
+            vectors, passages = vectors[:count], passages[:count]
+        except Exception as e:
+            print(f"Error loading vector index: {str(e)}")
+            return
+        self._vectors = vectors
+        self._passages = passages
+        self._ids = {chunk_id(passage) for passage in passages} | {chunk_id(p) for p in self._added_passages}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Build the local knowledge base index from an exported snapshot")
+    subparsers = parser.add_subparsers(dest='command', required=True)
+    build = subparsers.add_parser('build', help="embed exported chunks (JSONL) into an index directory")
+    build.add_argument('export', help="JSONL of Bedrock retrieval results or {\"text\", \"source\"} rows")
+    build.add_argument('index_dir')
+    build.add_argument('--model-id', default=os.getenv('KB_EMBEDDING_MODEL_ID', 'amazon.titan-embed-text-v2:0'))
+    build.add_argument('--region', default=os.getenv('AWS_REGION', 'us-east-1'))
+    args = parser.parse_args()
+
+    with open(args.export) as f:
+        records = [json.loads(line) for line in f if line.strip()]
+    index = VectorIndex.build(args.index_dir, records, titan_embedder(args.model_id, args.region))
+    print(f"Indexed {len(index)} chunks in {args.index_dir}")
+
+
+if __name__ == "__main__":
+    main()
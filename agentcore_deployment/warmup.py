@@ -0,0 +1,78 @@
+"""
+Background warm-up for AgentCore Runtime cold starts
+Defers the heavy agent imports until after the HTTP server is up, then
+pre-builds the shared model and clients before the first request needs them
+"""
+import importlib
+import threading
+import time
+from types import ModuleType
+from typing import Dict, Optional
+
+_ready = threading.Event()
+_lock = threading.Lock()
+_thread: Optional[threading.Thread] = None
+_agent_module: Optional[ModuleType] = None
+_error: Optional[BaseException] = None
+
+# Seconds spent in each warm-up phase, for startup diagnostics
+timings: Dict[str, float] = {}
+
+
+def start() -> None:
+    """Start warming in a background thread (safe to call repeatedly)"""
+    global _thread
+    with _lock:
+        if _thread is None:
+            _thread = threading.Thread(target=_warm, name='warmup', daemon=True)
+            _thread.start()
+
+
+def is_ready() -> bool:
+    return _ready.is_set()
+
+
+def wait(timeout: Optional[float] = None) -> ModuleType:
+    """Block until warm-up finished and return the agent module"""
+    start()
+    if not _ready.wait(timeout):
+        raise TimeoutError("Agent warm-up did not finish in time")
+    if _agent_module is None:
+        raise RuntimeError(f"Agent warm-up failed: {str(_error)}")
+    return _agent_module
+
+
+def _timed(phase: str, func):
+    started = time.perf_counter()
+    try:
+        return func()
+    finally:
+        timings[phase] = time.perf_counter() - started
+
+
+def _warm() -> None:
+    global _agent_module, _error
+    started = time.perf_counter()
+    try:
+        agent = _timed('import_agent', lambda: importlib.import_module('agent'))
+        _agent_module = agent
+
+        # Failures below only cost latency later, so they must not block requests
+        for phase, func in (
+            ('shared_model', agent.get_shared_model),
+            ('fast_model', lambda: agent.BEDROCK_FAST_MODEL_ID and agent.get_shared_model(agent.BEDROCK_FAST_MODEL_ID)),
+            ('kb_client', lambda: agent.get_client('bedrock-agent-runtime', agent.REGION)),
+            ('memory_client', lambda: agent.get_client('bedrock-agentcore', agent.REGION)),
+            ('tavily_client', agent.get_tavily_client),
+        ):
+            try:
+                _timed(phase, func)
+            except Exception as e:
+                print(f"Warm-up step {phase} failed: {str(e)}")
+    except BaseException as e:
+        _error = e
+        print(f"Agent warm-up failed: {str(e)}")
+    finally:
+        timings['total'] = time.perf_counter() - started
+        print("Agent warm-up: " + ", ".join(f"{phase}={seconds:.3f}s" for phase, seconds in timings.items()))
+        _ready.set()
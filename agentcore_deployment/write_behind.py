@@ -0,0 +1,180 @@
+"""
+Write-behind persistence for AgentCore memory events
+Buffers a session's messages and agent state while the turn runs and writes
+them in batches on a background pool after the response has been returned,
+so remote memory writes stay off the critical path of every turn
+
+Batching is the memory integration's own (``batch_size``); the only private
+hook used is ``_flush_messages``, which the integration calls at the end of
+every invocation and which is redirected to the background writer here. The
+bedrock-agentcore version is pinned in requirements.txt because of it, and
+tests/test_write_behind.py exercises the flush path against that version.
+"""
+import atexit
+import threading
+import time
+import weakref
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Dict, List, Optional
+
+from opentelemetry import trace
+from bedrock_agentcore.memory.integrations.strands.session_manager import AgentCoreMemorySessionManager
+
+tracer = trace.get_tracer("copilot")
+
+# Largest batch_size AgentCoreMemoryConfig accepts
+MAX_BATCH_SIZE = 100
+
+
+class MemoryWriter:
+    """Process-wide background writer for ``WriteBehindSessionManager`` buffers
+
+    Flush requests for the same session manager are coalesced, and a manager
+    is only ever flushed by one thread at a time. Failed flushes are retried
+    with exponential backoff; if every attempt fails the events stay buffered
+    for the next flush. ``wait`` blocks until a manager's scheduled flush has
+    finished, ``drain`` flushes synchronously and ``shutdown`` drains every
+    manager with pending events (registered to run at exit).
+    """
+
+    def __init__(self, max_workers: int = 4, retries: int = 3, backoff: float = 0.5):
+        self.retries = retries
+        self.backoff = backoff
+        self._pool = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='memory-writer')
+        self._lock = threading.Lock()
+        self._scheduled: "weakref.WeakSet[WriteBehindSessionManager]" = weakref.WeakSet()
+        self._inflight: "weakref.WeakKeyDictionary[WriteBehindSessionManager, Future]" = weakref.WeakKeyDictionary()
+        self._managers: "weakref.WeakSet[WriteBehindSessionManager]" = weakref.WeakSet()
+        self.flushes = 0
+        self.retried = 0
+        self.failures = 0
+        atexit.register(self.shutdown)
+
+    def register(self, manager: "WriteBehindSessionManager") -> None:
+        with self._lock:
+            self._managers.add(manager)
+
+    def schedule(self, manager: "WriteBehindSessionManager") -> None:
+        """Flush a manager in the background (no-op if a flush is already queued)"""
+        with self._lock:
+            if manager in self._scheduled:
+                return
+            self._scheduled.add(manager)
+            try:
+                self._inflight[manager] = self._pool.submit(self._run, manager)
+                return
+            except RuntimeError:
+                # Pool already shut down (interpreter exiting), write inline instead
+                pass
+        self._run(manager)
+
+    def wait(self, manager: "WriteBehindSessionManager", timeout: Optional[float] = None) -> None:
+        """Block until the manager's latest scheduled flush has finished"""
+        with self._lock:
+            future = self._inflight.get(manager)
+        if future is not None:
+            future.result(timeout)
+        # A flush submitted earlier may still hold the manager's flush lock
+        with manager.flush_lock:
+            pass
+
+    def drain(self, manager: "WriteBehindSessionManager") -> bool:
+        """Flush a manager in the calling thread; returns False if events remain buffered"""
+        with self._lock:
+            self._managers.discard(manager)
+        self.wait(manager)
+        return self._flush_with_retry(manager)
+
+    def shutdown(self) -> None:
+        """Drain every manager that still has buffered events"""
+        with self._lock:
+            managers = list(self._managers)
+        for manager in managers:
+            if manager.pending_count():
+                self.drain(manager)
+        self._pool.shutdown(wait=True)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            managers = list(self._managers)
+        return {
+            'sessions': len(managers),
+            'pending_events': sum(manager.pending_count() for manager in managers),
+            'flushes': self.flushes,
+            'retried': self.retried,
+            'failures': self.failures
+        }
+
+    def _run(self, manager: "WriteBehindSessionManager") -> None:
+        # Unmark first so events buffered during this flush get their own
+        with self._lock:
+            self._scheduled.discard(manager)
+        self._flush_with_retry(manager)
+
+    def _flush_with_retry(self, manager: "WriteBehindSessionManager") -> bool:
+        for attempt in range(self.retries + 1):
+            try:
+                with tracer.start_as_current_span(
+                    "copilot.memory_flush",
+                    attributes={'copilot.session_id': manager.config.session_id, 'copilot.memory.attempt': attempt}
+                ) as span:
+                    written = manager.flush_pending()
+                    span.set_attribute('copilot.memory.events', len(written))
+                self.flushes += 1
+                return True
+            except Exception as e:
+                if attempt == self.retries:
+                    self.failures += 1
+                    print(f"Memory flush for session {manager.config.session_id} failed, keeping events buffered: {str(e)}")
+                    return False
+                self.retried += 1
+                time.sleep(self.backoff * (2 ** attempt))
+        return False
+
+
+class WriteBehindSessionManager(AgentCoreMemorySessionManager):
+    """AgentCore memory session manager that persists through a ``MemoryWriter``
+
+    Uses the integration's message buffering with ``batch_size`` messages per
+    batch (at most ``MAX_BATCH_SIZE``); a full batch is written inline by the
+    integration as backpressure. End-of-turn flushes are handed to the writer
+    instead of running inline. The integration puts a failed batch back in the
+    buffer after anything buffered meanwhile, so ``wait_for_flush`` must be
+    called before a turn adds messages: the session's next turn then never
+    overlaps a flush and a session's events are never reordered. ``close``
+    drains the buffer synchronously.
+    """
+
+    def __init__(self, writer: MemoryWriter, batch_size: int = 32, **kwargs: Any):
+        self.writer = writer
+        self.flush_lock = threading.Lock()
+        config = kwargs['agentcore_memory_config']
+        kwargs['agentcore_memory_config'] = config.model_copy(update={'batch_size': max(2, min(batch_size, MAX_BATCH_SIZE))})
+        super().__init__(**kwargs)
+        writer.register(self)
+
+    def pending_count(self) -> int:
+        return self.pending_message_count() + self.pending_agent_state_count()
+
+    def flush_pending(self) -> List[Dict[str, Any]]:
+        """Write buffered messages, then agent state, in the calling thread"""
+        with self.flush_lock:
+            return super()._flush_messages()
+
+    def schedule_flush(self) -> None:
+        """Hand buffered events to the writer (what the end-of-turn hook does)"""
+        if self.pending_count():
+            self.writer.schedule(self)
+
+    def wait_for_flush(self, timeout: Optional[float] = None) -> None:
+        """Wait for the previous turn's background flush before adding messages"""
+        self.writer.wait(self, timeout)
+
+    def close(self) -> None:
+        """Drain buffered events before the session manager is discarded"""
+        self.writer.drain(self)
+
+    def _flush_messages(self) -> List[Dict[str, Any]]:
+        # Called by the end-of-turn hook: hand off to the writer
+        self.schedule_flush()
+        return []
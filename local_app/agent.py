@@ -3,7 +3,6 @@ ADP Copilot Backend - Core agent functionality extracted from notebook
 """
 import os
 import uuid
-import boto3
 from typing import Dict, List, Optional, Tuple
 from dotenv import load_dotenv
 
@@ -13,6 +12,8 @@ from bedrock_agentcore.memory import MemoryClient
 from bedrock_agentcore.memory.integrations.strands.config import AgentCoreMemoryConfig
 from bedrock_agentcore.memory.integrations.strands.session_manager import AgentCoreMemorySessionManager
 
+from clients import get_client
+
 # Load environment variables
 load_dotenv()
 
@@ -26,7 +27,7 @@ def knowledge_base_search(query: str) -> str:
             return "Error: KNOWLEDGE_BASE_ID environment variable not set"
         
         region = os.getenv("AWS_REGION", "us-east-1")
-        client = boto3.client('bedrock-agent-runtime', region_name=region)
+        client = get_client('bedrock-agent-runtime', region)
         response = client.retrieve(
             knowledgeBaseId=kb_id,
             retrievalQuery={'text': query},
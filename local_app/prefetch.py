@@ -0,0 +1,41 @@
+"""
+Background agent prefetch for the local Streamlit app
+Builds the agent for a selected session (memory restore included) on a
+worker thread, so it is ready by the time the user sends the first message
+"""
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Dict, Optional, Tuple
+
+from agent import CopilotAgent
+
+# Agents kept for sessions that were selected but not used yet (oldest dropped first)
+MAX_PREFETCHED = 4
+
+_executor = ThreadPoolExecutor(max_workers=2, thread_name_prefix='agent-prefetch')
+_futures: Dict[Tuple[str, str], Future] = {}
+_lock = threading.Lock()
+
+
+def start(actor_id: str, session_id: str) -> Future:
+    """Start building the agent for a session unless a build is already underway"""
+    key = (actor_id, session_id)
+    with _lock:
+        future = _futures.get(key)
+        if future is None:
+            future = _executor.submit(CopilotAgent, actor_id=actor_id, session_id=session_id)
+            _futures[key] = future
+            while len(_futures) > MAX_PREFETCHED:
+                _futures.pop(next(iter(_futures))).cancel()
+        return future
+
+
+def take(actor_id: str, session_id: str, timeout: Optional[float] = None) -> CopilotAgent:
+    """Wait for the prefetched agent and hand it over (each agent is taken once)"""
+    future = start(actor_id, session_id)
+    try:
+        return future.result(timeout=timeout)
+    finally:
+        with _lock:
+            if _futures.get((actor_id, session_id)) is future and future.done():
+                del _futures[(actor_id, session_id)]
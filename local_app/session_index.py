@@ -0,0 +1,62 @@
+"""
+Cached session index for the local Streamlit sidebar
+Keeps each actor's session list for a short TTL so Streamlit reruns don't
+call list_sessions; stale lists are served while a background refresh runs
+"""
+import os
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Dict, List, Optional, Tuple
+
+from utils import get_previous_sessions
+
+# Seconds a session list is served without refreshing (override via environment)
+SESSION_INDEX_TTL = float(os.getenv('SESSION_INDEX_TTL', '30'))
+
+_executor = ThreadPoolExecutor(max_workers=2, thread_name_prefix='session-index')
+_entries: Dict[str, Tuple[float, List[str]]] = {}
+_refreshing: Dict[str, Future] = {}
+# Bumped by invalidate so a refresh started before it cannot store its older result
+_generations: Dict[str, int] = {}
+_lock = threading.Lock()
+
+
+def get_sessions(actor_id: str) -> List[str]:
+    """Session IDs of an actor: cached, stale while refreshing, or fetched on first use"""
+    with _lock:
+        entry = _entries.get(actor_id)
+    if entry is None:
+        return refresh(actor_id).result()
+    fetched_at, sessions = entry
+    if time.time() - fetched_at >= SESSION_INDEX_TTL:
+        refresh(actor_id)
+    return sessions
+
+
+def refresh(actor_id: str) -> Future:
+    """Re-list an actor's sessions in the background (joins a refresh already running)"""
+    with _lock:
+        future = _refreshing.get(actor_id)
+        if future is None:
+            future = _executor.submit(_fetch, actor_id, _generations.get(actor_id, 0))
+            _refreshing[actor_id] = future
+        return future
+
+
+def invalidate(actor_id: Optional[str] = None) -> None:
+    """Forget one actor's session list, or all of them"""
+    with _lock:
+        for actor in ([actor_id] if actor_id is not None else list(_entries) + list(_refreshing)):
+            _entries.pop(actor, None)
+            _refreshing.pop(actor, None)
+            _generations[actor] = _generations.get(actor, 0) + 1
+
+
+def _fetch(actor_id: str, generation: int) -> List[str]:
+    sessions = get_previous_sessions(actor_id)
+    with _lock:
+        if _generations.get(actor_id, 0) == generation:
+            _entries[actor_id] = (time.time(), sessions)
+            _refreshing.pop(actor_id, None)
+    return sessions
@@ -4,8 +4,9 @@ Copilot Streamlit App - Lightweight frontend for the AI agent
 import streamlit as st
 import uuid
 from datetime import datetime
-from agent import CopilotAgent
-from utils import check_environment, get_previous_sessions, get_messages_for_session
+import prefetch
+import session_index
+from utils import check_environment, iter_messages_for_session
 
 # Page configuration
 st.set_page_config(
@@ -68,6 +69,7 @@ def display_session_management():
             
             with col1:
                 if st.button("🆕 New Session"):
+                    session_index.invalidate(st.session_state.actor_id)
                     st.session_state.session_id = str(uuid.uuid4())
                     st.session_state.messages = []
                     st.session_state.agent = None
@@ -76,6 +78,7 @@ def display_session_management():
             with col2:
                 if st.button("📋 Show Previous Sessions"):
                     # Force refresh of previous sessions for current actor
+                    session_index.invalidate(st.session_state.actor_id)
                     st.rerun()
             
             # Display current session info
@@ -83,7 +86,7 @@ def display_session_management():
         
         # Previous sessions in separate collapsible section
         try:
-            prev_sessions = get_previous_sessions(st.session_state.actor_id)
+            prev_sessions = session_index.get_sessions(st.session_state.actor_id)
             if prev_sessions:
                 with st.expander("📝 Previous Sessions", expanded=False):
                     for session in prev_sessions[:5]:  # Show last 5
@@ -94,6 +97,8 @@ def display_session_management():
                                 st.session_state.session_id = session
                                 st.session_state.messages = []
                                 st.session_state.agent = None
+                                # Restore the session while the user types
+                                prefetch.start(st.session_state.actor_id, session)
                                 st.rerun()
                         
                         with col2:
@@ -105,20 +110,28 @@ def display_session_management():
             st.error(f"Error loading sessions: {str(e)}")
 
 def initialize_agent():
-    """Initialize or get the agent instance"""
+    """Pick up the agent once its background build has finished (never blocks)"""
     if st.session_state.agent is None:
+        future = prefetch.start(st.session_state.actor_id, st.session_state.session_id)
+        if not future.done():
+            with st.sidebar:
+                st.caption("⏳ Restoring session in the background...")
+            return True
         try:
-            with st.spinner("Initializing AI agent..."):
-                st.session_state.agent = CopilotAgent(
-                    actor_id=st.session_state.actor_id,
-                    session_id=st.session_state.session_id
-                )
+            st.session_state.agent = prefetch.take(st.session_state.actor_id, st.session_state.session_id)
             st.success("Agent initialized successfully!")
         except Exception as e:
             st.error(f"Failed to initialize agent: {str(e)}")
             return False
     return True
 
+def get_agent():
+    """Get the agent, waiting for the background build if it is still running"""
+    if st.session_state.agent is None:
+        with st.spinner("Restoring session..."):
+            st.session_state.agent = prefetch.take(st.session_state.actor_id, st.session_state.session_id)
+    return st.session_state.agent
+
 def display_session_messages():
     """Display messages from a selected session"""
     if 'viewing_session' in st.session_state and st.session_state.viewing_session:
@@ -137,21 +150,26 @@ def display_session_messages():
                 st.session_state.session_id = session_id
                 st.session_state.messages = []
                 st.session_state.agent = None
+                prefetch.start(st.session_state.actor_id, session_id)
                 del st.session_state.viewing_session
                 st.rerun()
         
         st.divider()
         
-        # Get and display messages
+        # Render each page of messages as it arrives (newest first)
         try:
-            messages = get_messages_for_session(st.session_state.actor_id, session_id)
-            if messages:
-                st.success(f"Found {len(messages)} messages")
-                for i, msg in enumerate(messages):
-                    with st.expander(f"Message {i+1}", expanded=False):
+            status = st.empty()
+            count = 0
+            for page in iter_messages_for_session(st.session_state.actor_id, session_id):
+                for msg in page:
+                    count += 1
+                    with st.expander(f"Message {count}", expanded=False):
                         st.json(msg)
+                status.info(f"Loading... {count} messages so far")
+            if count:
+                status.success(f"Found {count} messages")
             else:
-                st.warning("No messages found for this session")
+                status.warning("No messages found for this session")
         except Exception as e:
             st.error(f"Error retrieving messages: {str(e)}")
         
@@ -194,7 +212,7 @@ def display_chat_interface():
         with st.chat_message("assistant"):
             with st.spinner("Thinking..."):
                 try:
-                    response = st.session_state.agent.chat(prompt)
+                    response = get_agent().chat(prompt)
                     st.markdown(response)
                     
                     # Add assistant message
@@ -207,6 +225,10 @@ def display_chat_interface():
                         "timestamp": response_timestamp
                     })
                     
+                    # The first exchange creates the session in memory, list it on the next refresh
+                    if len(st.session_state.messages) == 2:
+                        session_index.invalidate(st.session_state.actor_id)
+                    
                 except Exception as e:
                     error_msg = f"Error: {str(e)}"
                     st.error(error_msg)
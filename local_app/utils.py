@@ -1,9 +1,13 @@
 import os
 import uuid
-import boto3
-from typing import Dict, List, Optional, Tuple
+from clients import get_client
+from typing import Dict, Iterator, List, Optional, Tuple
 from dotenv import load_dotenv
 
+# list_events page size (the API allows at most 100) and default cap on events read per session
+EVENTS_PAGE_SIZE = int(os.getenv('EVENTS_PAGE_SIZE', '50'))
+EVENTS_MAX_RESULTS = int(os.getenv('EVENTS_MAX_RESULTS', '1000'))
+
 def check_environment() -> Dict[str, bool]:
     """Check if all required environment variables are set"""
     required_vars = [
@@ -26,7 +30,7 @@ def get_previous_sessions(actor_id: str) -> List[str]:
         memory_id = os.getenv('MEMORY_ID')
         region = os.getenv('REGION', 'us-east-1')
         
-        client = boto3.client('bedrock-agentcore', region_name=region)
+        client = get_client('bedrock-agentcore', region)
 
         sessions = client.list_sessions(
             memoryId=memory_id,
@@ -45,28 +49,67 @@ def get_previous_sessions(actor_id: str) -> List[str]:
         print(f"Error getting previous sessions: {str(e)}")
         return []
 
-def get_messages_for_session(actor_id: str, session_id: str) -> List[Dict]:
-    """Get messages for a specific session"""
-    try:
-        memory_id = os.getenv('MEMORY_ID')
-        region = os.getenv('REGION', 'us-east-1')
+def iter_event_pages(
+    actor_id: str,
+    session_id: str,
+    page_size: int = EVENTS_PAGE_SIZE,
+    max_results: Optional[int] = EVENTS_MAX_RESULTS,
+    newest_first: bool = True
+) -> Iterator[List[Dict]]:
+    """Yield a session's events page by page as they arrive, following nextToken
+    
+    list_events returns the newest events first, so pages stream in that order.
+    With newest_first=False every page is read first and the events are yielded
+    as one chronological page.
+    """
+    memory_id = os.getenv('MEMORY_ID')
+    region = os.getenv('REGION', 'us-east-1')
+    client = get_client('bedrock-agentcore', region)
+    
+    remaining = max_results
+    next_token = None
+    pages = []
+    while remaining is None or remaining > 0:
+        params = {
+            'memoryId': memory_id,
+            'actorId': actor_id,
+            'sessionId': session_id,
+            'maxResults': min(page_size, 100, remaining or 100)
+        }
+        if next_token:
+            params['nextToken'] = next_token
+        response = client.list_events(**params)
         
-        client = boto3.client('bedrock-agentcore', region_name=region)
-        
-        events = client.list_events(
-            memoryId=memory_id,
-            actorId=actor_id,
-            sessionId=session_id
-        )
+        events = response.get('events', [])
+        if remaining is not None:
+            events = events[:remaining]
+            remaining -= len(events)
+        if newest_first:
+            if events:
+                yield events
+        else:
+            pages.append(events)
         
+        next_token = response.get('nextToken')
+        if not next_token:
+            break
+    
+    if not newest_first:
+        yield [event for page in reversed(pages) for event in reversed(page)]
+
+def iter_messages_for_session(actor_id: str, session_id: str, **kwargs) -> Iterator[List[Dict]]:
+    """Yield pages of message payloads for a session (see iter_event_pages for options)"""
+    for events in iter_event_pages(actor_id, session_id, **kwargs):
+        yield [event['payload'] for event in events if event.get('payload')]
+
+def get_messages_for_session(actor_id: str, session_id: str, **kwargs) -> List[Dict]:
+    """Get messages for a specific session"""
+    try:
         messages = []
-        for event in events.get('events', []):
-            payload = event.get('payload', {})
-            if payload:
-                messages.append(payload)
-        
+        for page in iter_messages_for_session(actor_id, session_id, **kwargs):
+            messages.extend(page)
         return messages
         
     except Exception as e:
         print(f"Error getting messages for session: {str(e)}")
-        return []
\ No newline at end of file
+        return []